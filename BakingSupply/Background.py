@@ -0,0 +1,117 @@
+﻿import bpy, json, os, shutil, subprocess, tempfile
+from typing import List, Optional
+
+# exports currently running in a background Blender, polled by the modal operators
+RUNNING_EXPORTS: List["BackgroundExport"] = []
+
+# line printed by the background script once a file is complete
+DONE_MARKER = "BAKEFLOW_EXPORT_DONE"
+
+# Runs inside `blender -b`: append the snapshot objects into an empty scene and write every FBX.
+# Files are written under a temporary name and renamed, so a reader never sees a partial FBX.
+_EXPORT_SCRIPT = '''
+import bpy, json, os, sys
+
+args = json.loads(sys.argv[sys.argv.index("--") + 1])
+bpy.ops.wm.read_factory_settings(use_empty=True)
+scene = bpy.context.scene
+# the FBX exporter scales by the unit settings (apply_unit_scale), use the ones of the exported scene
+for key, value in args["units"].items():
+    setattr(scene.unit_settings, key, value)
+
+for job in args["jobs"]:
+    with bpy.data.libraries.load(args["snapshot"], link=False) as (data_from, data_to):
+        data_to.objects = [name for name in job["objects"] if name in data_from.objects]
+    for obj in scene.objects:
+        obj.select_set(False)
+    for obj in data_to.objects:
+        if obj.name not in scene.collection.objects:
+            scene.collection.objects.link(obj)
+        obj.select_set(True)
+
+    settings = dict(job["settings"])
+    if "object_types" in settings:
+        settings["object_types"] = set(settings["object_types"])
+    partial_path = job["path"] + ".part.fbx"
+    bpy.ops.export_scene.fbx(filepath=partial_path, **settings)
+    os.replace(partial_path, job["path"])
+    print("{marker}", job["path"], flush=True)
+'''.replace("{marker}", DONE_MARKER)
+
+def _json_settings(settings: dict) -> dict:
+    return {key: sorted(value) if isinstance(value, (set, frozenset)) else value for key, value in settings.items()}
+
+class BackgroundExport:
+    """FBX export of a snapshot of the scene, written by a background Blender process."""
+    def __init__(self, jobs):
+        # jobs: list of (export_path, objects, fbx settings)
+        self.jobs = jobs
+        self.total = len(jobs)
+        self.done = 0
+        self.finished = False
+        self.error: Optional[str] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._work_dir = tempfile.mkdtemp(prefix="bakeflow_export_")
+        self._log_path = os.path.join(self._work_dir, "export.log")
+
+    @property
+    def failed(self) -> bool:
+        return self.finished and self.error is not None
+
+    def _snapshot(self, context):
+        """Write the objects to export into a .blend, with everything they depend on (armatures included)."""
+        snapshot_path = os.path.join(self._work_dir, "snapshot.blend")
+        datablocks = set()
+        job_args = []
+        for export_path, objects, settings in self.jobs:
+            datablocks.update(objects)
+            job_args.append({"path": export_path, "objects": [obj.name for obj in objects], "settings": _json_settings(settings)})
+        bpy.data.libraries.write(snapshot_path, datablocks, fake_user=True)
+        units = context.scene.unit_settings
+        unit_args = {"system": units.system, "scale_length": units.scale_length, "length_unit": units.length_unit}
+        return {"snapshot": snapshot_path, "jobs": job_args, "units": unit_args}
+
+    def start(self, context):
+        args = self._snapshot(context)
+        script_path = os.path.join(self._work_dir, "export.py")
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(_EXPORT_SCRIPT)
+        with open(self._log_path, "w", encoding="utf-8") as log:
+            self._process = subprocess.Popen(
+                [bpy.app.binary_path, "-b", "--factory-startup", "--python-exit-code", "1",
+                 "--python", script_path, "--", json.dumps(args)],
+                stdout=log, stderr=subprocess.STDOUT,
+            )
+        RUNNING_EXPORTS.append(self)
+
+    def poll(self) -> bool:
+        """Refresh the progress, return True once the process is over."""
+        if self.finished:
+            return True
+        try:
+            with open(self._log_path, "r", encoding="utf-8", errors="replace") as log:
+                self.done = sum(1 for line in log if line.startswith(DONE_MARKER))
+        except OSError:
+            pass
+        code = self._process.poll()
+        if code is None:
+            return False
+        if code != 0 or self.done < self.total:
+            self.error = f"Background export failed (exit code {code}), see {self._log_path}"
+        # keep the log around when something went wrong
+        self._finish(keep_files=self.error is not None)
+        return True
+
+    def cancel(self):
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            self._process.wait()
+        self.error = "Background export cancelled"
+        self._finish(keep_files=False)
+
+    def _finish(self, keep_files: bool):
+        self.finished = True
+        if self in RUNNING_EXPORTS:
+            RUNNING_EXPORTS.remove(self)
+        if not keep_files:
+            shutil.rmtree(self._work_dir, ignore_errors=True)
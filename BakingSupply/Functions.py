@@ -1,6 +1,371 @@
-﻿import bpy
+﻿import bpy, hashlib, json, os, sys, ctypes
+import numpy as np
+from contextlib import contextmanager
+from .Proxy import bounds_proxy, cluster_proxy
 
 def GoToLine(layout, *, scale_y=1.2, align=True):
     row = layout.row(align=align)
     row.scale_y = scale_y
-    return row
\ No newline at end of file
+    return row
+
+# ===================== Memory =====================
+
+class _ProcessMemoryCounters(ctypes.Structure):
+    _fields_ = [
+        ("cb", ctypes.c_ulong),
+        ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+def peak_memory_mb():
+    """Peak resident memory of the Blender process in MB, None when the platform does not tell."""
+    if sys.platform == "win32":
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+# ===================== Export Manifest =====================
+
+# bump when the fingerprint layout changes, so old manifests never match
+MANIFEST_VERSION = 2
+
+def manifest_path(export_path: str) -> str:
+    return os.path.splitext(export_path)[0] + ".manifest.json"
+
+def _hash_array(digest, collection, attr: str, dtype, width: int = 1):
+    arr = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attr, arr)
+    digest.update(attr.encode())
+    digest.update(arr.tobytes())
+
+def mesh_data_hash(me, shape_keys=None) -> str:
+    """Hash of everything the FBX carries for a mesh: geometry, topology, shading (corner normals included,
+    so custom normals count), materials, UVs, color attributes and the shape keys of the original mesh."""
+    digest = hashlib.blake2b(digest_size=16)
+    _hash_array(digest, me.vertices, "co", np.float32, 3)
+    _hash_array(digest, me.loops, "vertex_index", np.int32)
+    _hash_array(digest, me.polygons, "loop_total", np.int32)
+    _hash_array(digest, me.polygons, "material_index", np.int32)
+    _hash_array(digest, me.polygons, "use_smooth", bool)
+    _hash_array(digest, me.edges, "use_edge_sharp", bool)
+    # Blender 4.1+ exposes the corner normals directly, older builds through the loops
+    if hasattr(me, "corner_normals"):
+        _hash_array(digest, me.corner_normals, "vector", np.float32, 3)
+    else:
+        _hash_array(digest, me.loops, "normal", np.float32, 3)
+    for uv_layer in me.uv_layers:
+        digest.update(uv_layer.name.encode())
+        _hash_array(digest, uv_layer.data, "uv", np.float32, 2)
+    for attribute in me.color_attributes:
+        digest.update(f"{attribute.name}:{attribute.domain}:{attribute.data_type}".encode())
+        _hash_array(digest, attribute.data, "color", np.float32, 4)
+    if shape_keys is not None:
+        for key_block in shape_keys.key_blocks:
+            digest.update(f"{key_block.name}:{key_block.value}:{key_block.mute}:{key_block.relative_key.name}".encode())
+            _hash_array(digest, key_block.data, "co", np.float32, 3)
+    return digest.hexdigest()
+
+def _json_value(value):
+    if isinstance(value, bpy.types.ID):
+        return value.name_full
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    try:
+        return [_json_value(v) for v in value]
+    except TypeError:
+        # str() of an RNA struct holds its memory address, which changes every session
+        return None
+
+def _struct_settings(struct, depth: int = 0) -> dict:
+    """Settings of an RNA struct, recursing into the non-ID structs it points to (cloth settings, point cache...)."""
+    settings = {}
+    for prop in struct.bl_rna.properties:
+        if prop.identifier == "rna_type" or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, prop.identifier)
+        if prop.type == 'POINTER' and not isinstance(value, bpy.types.ID):
+            if value is not None and depth < 3:
+                settings[prop.identifier] = _struct_settings(value, depth + 1)
+            continue
+        settings[prop.identifier] = _json_value(value)
+    return settings
+
+def modifier_stack(obj) -> list:
+    return [_struct_settings(mod) for mod in obj.modifiers]
+
+def export_fingerprint(objects, settings: dict, depsgraph, evaluated: bool = False) -> dict:
+    """Manifest of an export. The evaluated mesh is hashed when evaluated is set (posed export), or when the
+    object has modifiers or custom normals: modifier targets and armatures change the exported result too."""
+    records = []
+    for obj in sorted(objects, key=lambda o: o.name):
+        mesh_hash = None
+        if obj.type == 'MESH':
+            shape_keys = obj.data.shape_keys
+            if evaluated or len(obj.modifiers) or obj.data.has_custom_normals:
+                eval_obj = obj.evaluated_get(depsgraph)
+                mesh_hash = mesh_data_hash(eval_obj.to_mesh(), shape_keys)
+                eval_obj.to_mesh_clear()
+            else:
+                mesh_hash = mesh_data_hash(obj.data, shape_keys)
+        records.append({
+            "name": obj.name,
+            "mesh": mesh_hash,
+            "modifiers": modifier_stack(obj),
+            "materials": [slot.material.name_full if slot.material else None for slot in obj.material_slots],
+            "matrix_world": [list(row) for row in obj.matrix_world],
+        })
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "settings": {key: _json_value(value) for key, value in settings.items()},
+        "objects": records,
+    }
+    manifest["fingerprint"] = hashlib.blake2b(json.dumps(manifest, sort_keys=True).encode(), digest_size=16).hexdigest()
+    return manifest
+
+def export_is_current(export_path: str, manifest: dict) -> bool:
+    """True when the file exists and was written from the same fingerprint."""
+    if not os.path.exists(export_path):
+        return False
+    try:
+        with open(manifest_path(export_path), "r", encoding="utf-8") as f:
+            return json.load(f).get("fingerprint") == manifest["fingerprint"]
+    except (OSError, ValueError):
+        return False
+
+def write_manifest(export_path: str, manifest: dict):
+    with open(manifest_path(export_path), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+# ===================== Pairing =====================
+
+def object_bounds(objects):
+    """Names and world-space bounding boxes, (n, 2, 3) min/max, of the given objects."""
+    names = [obj.name for obj in objects]
+    boxes = np.empty((len(names), 2, 3), dtype=np.float64)
+    for i, obj in enumerate(objects):
+        corners = np.asarray(obj.bound_box, dtype=np.float64)
+        matrix = np.asarray(obj.matrix_world, dtype=np.float64)
+        world = corners @ matrix[:3, :3].T + matrix[:3, 3]
+        boxes[i, 0] = world.min(axis=0)
+        boxes[i, 1] = world.max(axis=0)
+    return names, boxes
+
+# ===================== Renaming =====================
+
+def apply_renames(renames) -> int:
+    """Assign (object, new name) pairs planned by Rename.plan_names in two phases, return how many changed.
+
+    Phase one moves every renamed object to a temporary name, freeing all the old names at once;
+    phase two assigns the final names, none of which collide any more.
+    """
+    changed = [(obj, name) for obj, name in renames if obj.name != name]
+    for i, (obj, _) in enumerate(changed):
+        obj.name = f"__bf_rename_{i}"
+    for obj, name in changed:
+        obj.name = name
+    return len(changed)
+
+# ===================== Visibility =====================
+
+# collections Sort High/Low moves the bake meshes into, so a show/hide is one flag flip
+MANAGED_COLLECTIONS = {"_high": "BF_High", "_low": "BF_Low"}
+
+def layer_collections(view_layer) -> dict:
+    """Collection -> its LayerCollections in the view layer, a collection linked twice has two."""
+    found = {}
+    stack = [view_layer.layer_collection]
+    while stack:
+        layer_collection = stack.pop()
+        found.setdefault(layer_collection.collection, []).append(layer_collection)
+        stack.extend(layer_collection.children)
+    return found
+
+def fallback_objects(objects, managed) -> list:
+    """The objects a flip of the managed collection does not reach: outside it, or linked somewhere else too."""
+    covered = set(managed.objects) if managed is not None else set()
+    # one user is the managed collection link, anything else may keep the object on screen
+    return [obj for obj in objects if obj not in covered or obj.users != 1]
+
+def set_visibility(view_layer, hide: bool, managed_name: str, fallback) -> int:
+    """Hide or show a bucket by flipping the view-layer flag of its managed collection, hide_set only the
+    fallback objects. Objects hidden on their own (H) inside the collection keep that state, Alt+H reveals them.
+    Returns the number of objects set one by one."""
+    managed = bpy.data.collections.get(managed_name)
+    if managed is not None:
+        for layer_collection in layer_collections(view_layer).get(managed, ()):
+            layer_collection.hide_viewport = hide
+
+    individual = 0
+    for obj in fallback:
+        try:
+            if obj.hide_get(view_layer=view_layer) == hide:
+                continue
+            obj.hide_set(hide, view_layer=view_layer)
+            individual += 1
+        except (RuntimeError, ReferenceError):
+            # not in this view layer, or deleted since the fallback was recorded
+            pass
+    return individual
+
+def collect_objects(view_layer, objects, name: str) -> int:
+    """Move objects into the managed collection name, created under the scene collection if missing.
+
+    Moved objects lose their own hidden flag, the collection is hidden instead when all of them were.
+    """
+    scene_collection = view_layer.layer_collection.collection
+    collection = bpy.data.collections.get(name)
+    if collection is None:
+        collection = bpy.data.collections.new(name)
+    if collection not in scene_collection.children_recursive:
+        scene_collection.children.link(collection)
+    moved = hidden = 0
+    for obj in objects:
+        users = list(obj.users_collection)
+        if users == [collection]:
+            continue
+        try:
+            if obj.hide_get(view_layer=view_layer):
+                obj.hide_set(False, view_layer=view_layer)
+                hidden += 1
+        except RuntimeError:
+            pass
+        if collection not in users:
+            collection.objects.link(obj)
+        for other in users:
+            if other != collection:
+                other.objects.unlink(obj)
+        moved += 1
+    if moved and hidden == moved:
+        for layer_collection in layer_collections(view_layer).get(collection, ()):
+            layer_collection.hide_viewport = True
+    return moved
+
+# ===================== Bake Staging =====================
+
+# custom properties of a staged object: its full-resolution mesh and the modifiers turned off with it
+STAGED_MESH = "bf_staged_mesh"
+STAGED_MODIFIERS = "bf_staged_modifiers"
+
+def is_staged(obj) -> bool:
+    return obj.get(STAGED_MESH) is not None
+
+def has_staging(obj) -> bool:
+    """Staged, or left with staging properties whose full mesh was deleted since."""
+    return STAGED_MESH in obj or STAGED_MODIFIERS in obj
+
+def _mesh_from_arrays(name: str, verts, faces, materials=None):
+    """Mesh built straight from (n, 3) positions and (m, k) face corner indices."""
+    me = bpy.data.meshes.new(name)
+    me.vertices.add(len(verts))
+    me.vertices.foreach_set("co", np.ascontiguousarray(verts, dtype=np.float32).ravel())
+    me.loops.add(faces.size)
+    me.loops.foreach_set("vertex_index", np.ascontiguousarray(faces, dtype=np.int32).ravel())
+    me.polygons.add(len(faces))
+    me.polygons.foreach_set("loop_start", np.arange(0, faces.size, max(faces.shape[1], 1), dtype=np.int32))
+    if materials is not None and len(materials):
+        me.polygons.foreach_set("material_index", np.ascontiguousarray(materials, dtype=np.int32))
+    me.update(calc_edges=True)
+    return me
+
+def build_proxy_mesh(me, kind: str, cells: int):
+    """Lightweight stand-in for me: its bounding box ('BOUNDS') or a vertex-clustered copy ('DECIMATE')."""
+    co = np.empty(len(me.vertices) * 3, dtype=np.float32)
+    me.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3)
+    name = f"{me.name}.bf_proxy"
+    if kind == 'BOUNDS':
+        verts, faces = bounds_proxy(co)
+        proxy = _mesh_from_arrays(name, verts, faces)
+    else:
+        me.calc_loop_triangles()
+        tris = np.empty(len(me.loop_triangles) * 3, dtype=np.int32)
+        me.loop_triangles.foreach_get("vertices", tris)
+        materials = np.empty(len(me.loop_triangles), dtype=np.int32)
+        me.loop_triangles.foreach_get("material_index", materials)
+        verts, faces, materials = cluster_proxy(co, tris.reshape(-1, 3), materials, cells)
+        proxy = _mesh_from_arrays(name, verts, faces, materials)
+    # keep the viewport colors of the material slots stored on the mesh
+    for material in me.materials:
+        proxy.materials.append(material)
+    return proxy
+
+def _set_staged_modifiers(obj, enabled: bool):
+    for name in obj.get(STAGED_MODIFIERS, ()):
+        modifier = obj.modifiers.get(name)
+        if modifier:
+            modifier.show_viewport = enabled
+
+def stage_objects(objects, kind: str, cells: int) -> int:
+    """Swap the mesh of every object for a proxy, one proxy per shared mesh. Returns how many were staged."""
+    proxies = {}
+    staged = 0
+    for obj in objects:
+        if obj.type != 'MESH' or is_staged(obj):
+            continue
+        original = obj.data
+        if original not in proxies:
+            proxies[original] = build_proxy_mesh(original, kind, cells)
+        # the ID property holds a user, the full mesh survives a save while staged
+        obj[STAGED_MESH] = original
+        obj[STAGED_MODIFIERS] = [m.name for m in obj.modifiers if m.show_viewport]
+        _set_staged_modifiers(obj, False)
+        obj.data = proxies[original]
+        staged += 1
+    return staged
+
+def unstage_objects(objects) -> int:
+    """Give staged objects their full mesh back and free the proxies left unused. Returns how many were restored."""
+    proxies = set()
+    restored = 0
+    for obj in objects:
+        if not has_staging(obj):
+            continue
+        # without its full mesh the object keeps the proxy, but gets its modifiers back
+        if is_staged(obj):
+            proxies.add(obj.data)
+            obj.data = obj[STAGED_MESH]
+        _set_staged_modifiers(obj, True)
+        for key in (STAGED_MESH, STAGED_MODIFIERS):
+            if key in obj:
+                del obj[key]
+        restored += 1
+    for proxy in proxies:
+        if proxy.users == 0:
+            bpy.data.meshes.remove(proxy)
+    return restored
+
+@contextmanager
+def full_resolution(objects):
+    """Put the full meshes of staged objects back for the duration of an export, then the proxies again."""
+    swapped = []
+    for obj in objects:
+        if not is_staged(obj):
+            continue
+        swapped.append((obj, obj.data))
+        obj.data = obj[STAGED_MESH]
+        _set_staged_modifiers(obj, True)
+    try:
+        yield
+    finally:
+        for obj, proxy in swapped:
+            obj.data = proxy
+            _set_staged_modifiers(obj, False)
@@ -0,0 +1,158 @@
+﻿import bpy, os, tempfile, time
+import numpy as np
+from contextlib import contextmanager
+
+# Minimal Wavefront OBJ writer for bake meshes: positions, corner normals, the active UV map,
+# material groups and one `o` block per object, streamed from foreach_get buffers chunk by chunk.
+
+# rows formatted per write call
+CHUNK_ROWS = 65536
+
+# Blender is Z-up, Marmoset reads OBJ as Y-up (same as the FBX export: forward -Z, up Y)
+_AXIS = np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0], [0.0, -1.0, 0.0]])
+
+def _read(collection, attr: str, dtype, width: int = 1):
+    arr = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attr, arr)
+    return arr if width == 1 else arr.reshape(-1, width)
+
+def obj_name(name: str) -> str:
+    """OBJ splits statements on whitespace and has no escaping: runs of it become one underscore."""
+    return "_".join(name.split()) or "_"
+
+def _write_rows(f, row_format: str, rows):
+    for start in range(0, len(rows), CHUNK_ROWS):
+        chunk = rows[start:start + CHUNK_ROWS]
+        f.write((row_format * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+def _corner_normals(me):
+    # Blender 4.1+ exposes the corner normals directly, older builds through the loops
+    if hasattr(me, "corner_normals"):
+        return _read(me.corner_normals, "vector", np.float32, 3)
+    return _read(me.loops, "normal", np.float32, 3)
+
+def _write_object(f, name: str, me, matrix, material_names, offsets):
+    matrix = np.array(matrix, dtype=np.float64)
+    linear = _AXIS @ matrix[:3, :3]
+    normal_matrix = _AXIS @ np.linalg.inv(matrix[:3, :3]).T
+
+    co = _read(me.vertices, "co", np.float32, 3) @ linear.T + _AXIS @ matrix[:3, 3]
+    normals = _corner_normals(me) @ normal_matrix.T
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+
+    f.write(f"o {obj_name(name)}\n")
+    _write_rows(f, "v %.6f %.6f %.6f\n", co)
+    has_uv = me.uv_layers.active is not None
+    if has_uv:
+        _write_rows(f, "vt %.6f %.6f\n", _read(me.uv_layers.active.data, "uv", np.float32, 2))
+    _write_rows(f, "vn %.4f %.4f %.4f\n", normals)
+
+    loop_verts = _read(me.loops, "vertex_index", np.int64)
+    loop_start = _read(me.polygons, "loop_start", np.int64)
+    loop_total = _read(me.polygons, "loop_total", np.int64)
+    material_index = _read(me.polygons, "material_index", np.int64)
+
+    v_offset, vt_offset, vn_offset = offsets
+    # a mirroring matrix turns the faces inside out, reverse their corners to keep them facing outwards
+    mirrored = np.linalg.det(matrix[:3, :3]) < 0
+    # faces grouped by material, then by size so every block shares one row format
+    for mat in np.unique(material_index):
+        in_material = material_index == mat
+        material = material_names[mat] if mat < len(material_names) and material_names[mat] else "None"
+        f.write(f"usemtl {obj_name(material)}\n")
+        for size in np.unique(loop_total[in_material]):
+            faces = np.flatnonzero(in_material & (loop_total == size))
+            corner_order = np.arange(size)[::-1] if mirrored else np.arange(size)
+            loops = loop_start[faces, None] + corner_order
+            if has_uv:
+                corners = np.stack((loop_verts[loops] + v_offset, loops + vt_offset, loops + vn_offset), axis=-1)
+                corner_format = " %d/%d/%d"
+            else:
+                corners = np.stack((loop_verts[loops] + v_offset, loops + vn_offset), axis=-1)
+                corner_format = " %d//%d"
+            _write_rows(f, "f" + corner_format * int(size) + "\n", corners.reshape(len(faces), -1))
+
+    return (v_offset + len(co), vt_offset + (len(me.loops) if has_uv else 0), vn_offset + len(normals))
+
+@contextmanager
+def _rest_pose(objects, depsgraph, enabled: bool = True):
+    """Turn the viewport armature modifiers of objects off while writing, like an export out of pose mode."""
+    disabled = [mod for obj in objects if enabled and obj.type == 'MESH'
+                for mod in obj.modifiers if mod.type == 'ARMATURE' and mod.show_viewport]
+    for mod in disabled:
+        mod.show_viewport = False
+    if disabled:
+        depsgraph.update()
+    try:
+        yield
+    finally:
+        for mod in disabled:
+            mod.show_viewport = True
+
+def write_obj(filepath: str, objects, depsgraph, in_pose: bool = True) -> int:
+    """Write the evaluated meshes of objects into one OBJ file, return the number of faces written.
+
+    Without in_pose the armature modifiers are left out, the meshes are written in their rest pose.
+    The file is written under a temporary name and renamed once complete.
+    """
+    partial_path = filepath + ".part"
+    face_count = 0
+    offsets = (1, 1, 1)
+    try:
+        with open(partial_path, "w", encoding="utf-8", newline="\n") as f, _rest_pose(objects, depsgraph, not in_pose):
+            f.write("# BakeFlow OBJ\n")
+            for obj in objects:
+                if obj.type != 'MESH':
+                    continue
+                eval_obj = obj.evaluated_get(depsgraph)
+                me = eval_obj.to_mesh()
+                try:
+                    material_names = [slot.material.name if slot.material else None for slot in obj.material_slots]
+                    offsets = _write_object(f, obj.name, me, obj.matrix_world, material_names, offsets)
+                    face_count += len(me.polygons)
+                finally:
+                    eval_obj.to_mesh_clear()
+        os.replace(partial_path, filepath)
+    finally:
+        # only left behind when the write failed
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    return face_count
+
+def benchmark_mesh_writers(objects=None):
+    """Time export_scene.fbx against write_obj on the given (default: selected) mesh objects.
+
+    Run it from Blender's Python console, in Object Mode:
+        from BakeFlow.BakingSupply.MeshWriter import benchmark_mesh_writers
+        benchmark_mesh_writers()
+    """
+    context = bpy.context
+    objects = [obj for obj in (objects or context.selected_objects) if obj.type == 'MESH']
+    depsgraph = context.evaluated_depsgraph_get()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bakeflow_bench_") as directory:
+        fbx_path = os.path.join(directory, "bench.fbx")
+        obj_path = os.path.join(directory, "bench.obj")
+
+        original_selection = list(context.selected_objects)
+        bpy.ops.object.select_all(action='DESELECT')
+        for obj in objects:
+            obj.select_set(True)
+        start = time.perf_counter()
+        bpy.ops.export_scene.fbx(filepath=fbx_path, use_selection=True)
+        results["fbx_seconds"] = time.perf_counter() - start
+        bpy.ops.object.select_all(action='DESELECT')
+        for obj in original_selection:
+            obj.select_set(True)
+
+        start = time.perf_counter()
+        results["faces"] = write_obj(obj_path, objects, depsgraph)
+        results["obj_seconds"] = time.perf_counter() - start
+
+        results["fbx_mb"] = os.path.getsize(fbx_path) / (1024 * 1024)
+        results["obj_mb"] = os.path.getsize(obj_path) / (1024 * 1024)
+
+    results["speedup"] = results["fbx_seconds"] / max(results["obj_seconds"], 1e-9)
+    print(f"{results['faces']} faces | export_scene.fbx {results['fbx_seconds']:.2f}s ({results['fbx_mb']:.1f} MB) "
+          f"| write_obj {results['obj_seconds']:.2f}s ({results['obj_mb']:.1f} MB) | x{results['speedup']:.1f}")
+    return results
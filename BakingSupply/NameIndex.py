@@ -0,0 +1,136 @@
+﻿import bpy
+from bpy.app.handlers import persistent
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+# ===================== High/Low Name Index =====================
+#
+# Buckets every object by the bake suffix in its name (case-insensitive, an object named like
+# `x_high_low` lands in both). Built on first query, then reused until a rename (msgbus), an object
+# count change (checked on query), an undo/redo or a file load invalidates it. msgbus does not see
+# renames made from Python: operators renaming objects call INDEX.invalidate() themselves, and the
+# depsgraph handler compares the names of the objects it reports as updated.
+
+HIGH, LOW, CAGE, OTHER = "_high", "_low", "_cage", "other"
+SUFFIXES = (HIGH, LOW, CAGE)
+
+def classify(name: str) -> FrozenSet[str]:
+    lowered = name.lower()
+    buckets = frozenset(suffix for suffix in SUFFIXES if suffix in lowered)
+    return buckets or frozenset((OTHER,))
+
+class NameIndex:
+    def __init__(self):
+        self._buckets: Optional[Dict[str, List[bpy.types.Object]]] = None
+        self._by_name: Dict[str, FrozenSet[str]] = {}
+        self._name_of: Dict[int, str] = {}
+        self._count = -1
+        self._generation = 0
+
+    def invalidate(self, *args):
+        self._buckets = None
+        self._by_name = {}
+        self._name_of = {}
+
+    def _build(self):
+        buckets: Dict[str, List[bpy.types.Object]] = {bucket: [] for bucket in (*SUFFIXES, OTHER)}
+        by_name: Dict[str, FrozenSet[str]] = {}
+        name_of: Dict[int, str] = {}
+        for obj in bpy.data.objects:
+            names = classify(obj.name)
+            by_name[obj.name] = names
+            name_of[obj.as_pointer()] = obj.name
+            for bucket in names:
+                buckets[bucket].append(obj)
+        self._buckets, self._by_name, self._name_of = buckets, by_name, name_of
+        self._count = len(bpy.data.objects)
+        self._generation += 1
+
+    @property
+    def stale(self) -> bool:
+        return self._buckets is None or self._count != len(bpy.data.objects)
+
+    def _ensure(self):
+        if self.stale:
+            self._build()
+
+    @property
+    def generation(self) -> int:
+        """Changes every time the index is rebuilt, to tell when data derived from it is out of date."""
+        self._ensure()
+        return self._generation
+
+    def objects(self, bucket: str) -> List[bpy.types.Object]:
+        """Objects of a bucket, across every scene."""
+        self._ensure()
+        try:
+            # touch the references: a stale one raises ReferenceError
+            return [obj for obj in self._buckets[bucket] if obj.name]
+        except ReferenceError:
+            self._build()
+            return list(self._buckets[bucket])
+
+    def check_renamed(self, objects: Iterable):
+        """Invalidate when one of objects no longer has the name it was indexed under."""
+        if self._buckets is None:
+            return
+        for obj in objects:
+            if self._name_of.get(obj.as_pointer(), obj.name) != obj.name:
+                self.invalidate()
+                return
+
+    def buckets_of(self, obj) -> FrozenSet[str]:
+        self._ensure()
+        names = self._by_name.get(obj.name)
+        return names if names is not None else classify(obj.name)
+
+    def contains(self, objects: Iterable, bucket: str) -> bool:
+        return any(bucket in self.buckets_of(obj) for obj in objects)
+
+    def filter(self, objects: Iterable, bucket: str) -> List:
+        return [obj for obj in objects if bucket in self.buckets_of(obj)]
+
+INDEX = NameIndex()
+
+# ===================== Invalidation =====================
+
+_MSGBUS_OWNER = object()
+
+def _subscribe():
+    bpy.msgbus.clear_by_owner(_MSGBUS_OWNER)
+    bpy.msgbus.subscribe_rna(key=(bpy.types.Object, "name"), owner=_MSGBUS_OWNER, args=(), notify=INDEX.invalidate)
+
+@persistent
+def _on_load(*args):
+    INDEX.invalidate()
+    # msgbus subscriptions do not survive loading a file
+    _subscribe()
+
+@persistent
+def _on_undo(*args):
+    INDEX.invalidate()
+
+@persistent
+def _on_depsgraph(scene, depsgraph):
+    # only the objects this update touched, a rename from Python tags the object it renames
+    if depsgraph.id_type_updated('OBJECT'):
+        INDEX.check_renamed(update.id.original for update in depsgraph.updates if isinstance(update.id, bpy.types.Object))
+
+_HANDLERS = (
+    (bpy.app.handlers.load_post, _on_load),
+    (bpy.app.handlers.undo_post, _on_undo),
+    (bpy.app.handlers.redo_post, _on_undo),
+    (bpy.app.handlers.depsgraph_update_post, _on_depsgraph),
+)
+
+def register():
+    for handlers, fn in _HANDLERS:
+        if fn not in handlers:
+            handlers.append(fn)
+    _subscribe()
+
+def unregister():
+    bpy.msgbus.clear_by_owner(_MSGBUS_OWNER)
+    for handlers, fn in _HANDLERS:
+        if fn in handlers:
+            handlers.remove(fn)
+    INDEX.invalidate()
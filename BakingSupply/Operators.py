@@ -1,9 +1,90 @@
-﻿import bpy, re, os
+﻿import bpy, os, time
+from .Functions import export_fingerprint, export_is_current, write_manifest, peak_memory_mb, object_bounds, apply_renames, \
+    set_visibility, fallback_objects, collect_objects, MANAGED_COLLECTIONS, stage_objects, unstage_objects, full_resolution, \
+    has_staging
+from .Background import BackgroundExport
+from .MeshWriter import write_obj
+from .NameIndex import INDEX, HIGH, LOW, SUFFIXES
+from .Pairing import pair_objects
+from .Rename import indexed_names, with_suffix, switched, transferred, plan_names
 
 
 #-----------Naming Operators-----------#
 # renmaing operators
 
+RENAME_MODES = [
+    ('INDEX', "Rename", "Rename selected objects with the base name and an index"),
+    ('ADD_SUFFIX', "Add Suffix", "Add '_high' or '_low' to selected mesh names, replacing an existing one"),
+    ('SWITCH_SUFFIX', "High <> Low", "Switch '_high' to '_low' and vice versa in selected object names"),
+    ('TRANSFER', "Transfer Name", "Give the active name, with its suffix switched, to the rest of the selection"),
+]
+
+def batch_rename(operator, context, mode: str, suffix: str = ""):
+    """Plan every new name of the selection in one pass, then rename in two phases."""
+    selected_objects = list(context.selected_objects)
+    if not selected_objects:
+        operator.report({'WARNING'}, "No objects selected. Please select at least one mesh object.")
+        return {'CANCELLED'}
+
+    if mode == 'INDEX':
+        base = context.scene.BF_BS_Properties.RenameName
+        if not base.strip():
+            operator.report({'ERROR'}, "Name cannot be empty. Please provide a name.")
+            return {'CANCELLED'}
+        objects = selected_objects
+        targets = indexed_names(base, len(objects))
+    elif mode == 'ADD_SUFFIX':
+        objects = [obj for obj in selected_objects if obj.type == 'MESH']
+        targets = [with_suffix(obj.name, suffix.lower()) for obj in objects]
+    elif mode == 'SWITCH_SUFFIX':
+        objects = selected_objects
+        targets = [switched(obj.name) for obj in objects]
+    else:
+        active_obj = context.active_object
+        if not active_obj:
+            operator.report({'WARNING'}, "No active object selected")
+            return {'CANCELLED'}
+        base = transferred(active_obj.name)
+        if not base:
+            operator.report({'WARNING'}, "Active object's name does not contain '_high' or '_low'")
+            return {'CANCELLED'}
+        objects = [obj for obj in selected_objects if obj != active_obj and obj.type == 'MESH']
+        targets = [base] * len(objects)
+
+    # names of every object outside the batch stay reserved, the batch's own names are free to reuse
+    renamed = {obj.name for obj in objects}
+    taken = {name for name in bpy.data.objects.keys() if name not in renamed}
+    plan = plan_names(list(zip(range(len(objects)), targets)), taken)
+    changed = apply_renames((obj, plan[i]) for i, obj in enumerate(objects))
+    INDEX.invalidate()
+    if mode == 'TRANSFER':
+        operator.report({'INFO'}, "Names transferred successfully")
+    elif changed:
+        operator.report({'INFO'}, f"{changed} objects renamed")
+    return {'FINISHED'}
+
+class BF_BS_BatchRename(bpy.types.Operator):
+    bl_idname = "object.bf_bs_batch_rename"
+    bl_label = "Batch Rename"
+    bl_description = "Rename the selection in one undo step, without name collisions"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode: bpy.props.EnumProperty(name="Mode", items=RENAME_MODES, default='INDEX')
+    rename_type: bpy.props.StringProperty(name="Rename Type", description="Suffix added by Add Suffix: high or low")
+
+    @classmethod
+    def description(cls, context, properties):
+        return next(item[2] for item in RENAME_MODES if item[0] == properties.mode)
+
+    @classmethod
+    def poll(cls, context):
+        # Prevent running outside object mode entirely
+        return context.mode == 'OBJECT'
+
+    def execute(self, context):
+        return batch_rename(self, context, self.mode, self.rename_type)
+
+# Former single-purpose operators, kept for existing keymaps and scripts
 class BF_BS_Renaming(bpy.types.Operator):
     bl_idname = "object.bf_bs_renaming_operator"
     bl_label = "Renaming Operator"
@@ -16,34 +97,7 @@ class BF_BS_Renaming(bpy.types.Operator):
         return context.mode == 'OBJECT'    
 
     def execute(self, context):
-        NameOfMeshes = bpy.context.scene.BF_BS_Properties.RenameName
-        count = 1
-        selected_objects = context.selected_objects
-        
-        if not selected_objects:
-            self.report({'WARNING'}, "No objects selected. Please select at least one mesh object.")
-            return {'CANCELLED'}
-        
-        if not NameOfMeshes.strip():
-            self.report({'ERROR'}, "Name cannot be empty. Please provide a name.")
-            return {'CANCELLED'}
-        
-        if len(selected_objects) == 1:
-            selected_objects[0].name = NameOfMeshes
-            return {'FINISHED'}
-        
-        for obj in selected_objects:
-            obj.name = f"{NameOfMeshes}_{count:02}"
-            count += 1
-            """
-            if obj.type == 'MESH':
-                obj.name = f"{NameOfMeshes}_{count:02}"
-                count += 1
-            """
-
-        return {'FINISHED'}
-
-
+        return batch_rename(self, context, 'INDEX')
 
 # Operator to replace "_high" with "_low" and vice versa
 class BF_BS_SwitchSuffix(bpy.types.Operator):
@@ -58,16 +112,7 @@ class BF_BS_SwitchSuffix(bpy.types.Operator):
         return context.mode == 'OBJECT'
 
     def execute(self, context):
-        pattern = re.compile(r'(_high|_low)', re.IGNORECASE)
-
-        def replace_case(match):
-            text = match.group(1).lower()
-            return '_low' if text == '_high' else '_high'
-
-        for obj in bpy.context.selected_objects:
-            obj.name = pattern.sub(replace_case, obj.name)
-
-        return {'FINISHED'}
+        return batch_rename(self, context, 'SWITCH_SUFFIX')
 
 # Operator to add "_high" or "_low" to object names, preventing duplicate suffixes
 class BF_BS_AddSuffix(bpy.types.Operator):
@@ -84,13 +129,7 @@ class BF_BS_AddSuffix(bpy.types.Operator):
     rename_type: bpy.props.StringProperty(name="Rename Type")
 
     def execute(self, context):
-        rename_type = self.rename_type.lower()
-        for obj in bpy.context.selected_objects:
-            if obj.type == 'MESH':
-                name = obj.name.rstrip("_high_low")  # Remove existing suffix if present
-                obj.name = f"{name}_{rename_type}"
-
-        return {'FINISHED'}
+        return batch_rename(self, context, 'ADD_SUFFIX', self.rename_type)
 
 # Operator to transfer names between _high and _low meshes with indexing
 class BF_BS_TransferName(bpy.types.Operator):
@@ -105,53 +144,115 @@ class BF_BS_TransferName(bpy.types.Operator):
         return context.mode == 'OBJECT'
 
     def execute(self, context):
-        active_obj = context.active_object
+        return batch_rename(self, context, 'TRANSFER')
 
-        if not active_obj:
-            self.report({'WARNING'}, "No active object selected")
-            return {'CANCELLED'}
 
-        name = active_obj.name
-        base_name = None
-
-        if "_high" in name:
-            base_name = name.replace("_high", "_low")
-        elif "_low" in name:
-            base_name = name.replace("_low", "_high")
+# Operator to pair every _high to its _low, by name then by overlapping bounds, into Marmoset bake groups
+class BF_BS_PairHighLow(bpy.types.Operator):
+    bl_idname = "object.bf_bs_pair_high_low"
+    bl_label = "Pair High/Low"
+    bl_description = "Match each _high mesh to a _low mesh by name, or by overlapping bounds when names differ, and rename the highs after their low so Marmoset groups them"
+    bl_options = {'REGISTER', 'UNDO'}
 
-        if not base_name:
-            self.report({'WARNING'}, "Active object's name does not contain '_high' or '_low'")
-            return {'CANCELLED'}
+    rename_highs: bpy.props.BoolProperty(
+        name="Rename Highs",
+        description="Rename paired highs to '<low name>_high' ('_high_01', '_high_02' for several)",
+        default=True
+    )
 
-        existing_names = {obj.name for obj in bpy.data.objects}  # Collect existing names
-        count = 1
+    @classmethod
+    def poll(cls, context):
+        # Prevent running outside object mode entirely
+        return context.mode == 'OBJECT'
 
-        for obj in context.selected_objects:
-            if obj != active_obj and obj.type == 'MESH':
-                new_name = base_name
-                while new_name in existing_names:
-                    new_name = f"{base_name}_{count:02}"
-                    count += 1
-                obj.name = new_name
-                existing_names.add(new_name)
+    def execute(self, context):
+        # the selection, or the whole view layer when nothing is selected
+        objects = [obj for obj in (context.selected_objects or context.view_layer.objects) if obj.type == 'MESH']
+        names, boxes = object_bounds(objects)
+        result = pair_objects(names, boxes)
+        if not result.groups:
+            self.report({'WARNING'}, "No '_low' mesh to pair with")
+            return {'CANCELLED'}
 
-        self.report({'INFO'}, "Names transferred successfully")
+        if self.rename_highs:
+            by_name = {obj.name: obj for obj in objects}
+            targets = []
+            for group in result.groups:
+                low_name = group.low
+                base = low_name[:low_name.lower().find("_low")]
+                targets += zip(group.highs, indexed_names(f"{base}_high", len(group.highs)))
+            renamed = {high for high, _ in targets}
+            taken = {name for name in bpy.data.objects.keys() if name not in renamed}
+            plan = plan_names(targets, taken)
+            apply_renames((by_name[high], name) for high, name in plan.items())
+            INDEX.invalidate()
+
+        if result.unmatched_highs:
+            self.report({'WARNING'}, f"{result.summary()}. Unmatched: " + ", ".join(result.unmatched_highs[:5])
+                        + ("..." if len(result.unmatched_highs) > 5 else ""))
+        else:
+            self.report({'INFO'}, result.summary())
         return {'FINISHED'}
 
 
 #-----------Visibility Operators-----------#
 
+# bucket -> ((index generation, managed collection size), fallback objects), recorded by Sort High/Low and
+# rebuilt only once the index or the collection changed, so a toggle does not walk the whole bucket
+_FALLBACK = {}
+
+def visibility_fallback(bucket: str, refresh: bool = False) -> list:
+    managed = bpy.data.collections.get(MANAGED_COLLECTIONS[bucket])
+    key = (INDEX.generation, len(managed.objects) if managed is not None else -1)
+    recorded = _FALLBACK.get(bucket)
+    if refresh or recorded is None or recorded[0] != key:
+        recorded = _FALLBACK[bucket] = (key, fallback_objects(INDEX.objects(bucket), managed))
+    return recorded[1]
+
+def set_hidden(context, bucket: str, hide: bool):
+    # the managed collection is flipped at once, the recorded fallback objects are hidden one by one
+    set_visibility(context.view_layer, hide, MANAGED_COLLECTIONS[bucket], visibility_fallback(bucket))
+
+# Operator to move high and low meshes into managed collections, making show/hide a single flag flip
+class BF_BS_SortHighLow(bpy.types.Operator):
+    bl_idname = "object.bf_bs_sort_high_low"
+    bl_label = "Sort High/Low"
+    bl_description = "Move '_high' and '_low' meshes into their own collections, so hiding or showing them is instant on heavy scenes"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT'
+
+    def execute(self, context):
+        in_scene = set(context.scene.objects)
+        highs = [obj for obj in INDEX.objects(HIGH) if obj in in_scene]
+        lows = [obj for obj in INDEX.objects(LOW) if obj in in_scene]
+        # a name with both suffixes belongs to neither collection
+        ambiguous = set(highs) & set(lows)
+        moved = 0
+        for bucket, objects in ((HIGH, highs), (LOW, lows)):
+            objects = [obj for obj in objects if obj not in ambiguous]
+            if objects:
+                moved += collect_objects(context.view_layer, objects, MANAGED_COLLECTIONS[bucket])
+            visibility_fallback(bucket, refresh=True)
+        if ambiguous:
+            names = sorted(obj.name for obj in ambiguous)
+            self.report({'WARNING'}, f"{moved} objects moved, {len(names)} named both '_high' and '_low' left in place: "
+                        + ", ".join(names[:5]) + ("..." if len(names) > 5 else ""))
+        else:
+            self.report({'INFO'}, f"{moved} objects moved")
+        return {'FINISHED'}
+
 #show low
 class BF_BS_ShowLow(bpy.types.Operator):
     """Operator to show or hide meshes with '_low' in their name"""
     bl_idname = "object.bf_bs_show_low_meshes"
     bl_label = "Show Low"
-    bl_description = "Show meshes with '_low' in their name"
+    bl_description = "Show meshes with '_low' in their name. Once sorted, their collection is toggled; meshes hidden on their own (H) inside it stay hidden"
 
     def execute(self, context):
-        for obj in context.view_layer.objects:
-            if "_low" in obj.name:
-                obj.hide_set(False)
+        set_hidden(context, LOW, False)
         return {'FINISHED'}
 
 
@@ -163,9 +264,7 @@ class BF_BS_HideLow(bpy.types.Operator):
     bl_description = "Hide meshes with '_low' in their name"
 
     def execute(self, context):
-        for obj in context.view_layer.objects:
-            if "_low" in obj.name:
-                obj.hide_set(True)
+        set_hidden(context, LOW, True)
         return {'FINISHED'}
 
 
@@ -174,12 +273,10 @@ class BF_BS_ShowHigh(bpy.types.Operator):
     """Operator to show or hide meshes with '_high' in their name"""
     bl_idname = "object.bf_bs_show_high_meshes"
     bl_label = "Show High"
-    bl_description = "Show meshes with '_high' in their name"
+    bl_description = "Show meshes with '_high' in their name. Once sorted, their collection is toggled; meshes hidden on their own (H) inside it stay hidden"
 
     def execute(self, context):
-        for obj in context.view_layer.objects:
-            if "_high" in obj.name:
-                obj.hide_set(False)
+        set_hidden(context, HIGH, False)
         return {'FINISHED'}
 
 
@@ -191,35 +288,120 @@ class BF_BS_HideHigh(bpy.types.Operator):
     bl_description = "Hide meshes with '_high' in their name"
 
     def execute(self, context):
-        for obj in context.view_layer.objects:
-            if "_high" in obj.name:
-                obj.hide_set(True)
+        set_hidden(context, HIGH, True)
+        return {'FINISHED'}
+
+#-----------Bake Staging-----------#
+
+def scene_highs(context):
+    in_scene = set(context.scene.objects)
+    return [obj for obj in INDEX.objects(HIGH) if obj in in_scene and obj.type == 'MESH']
+
+# Operator to swap '_high' meshes for light proxies while working on the lows
+class BF_BS_StageHigh(bpy.types.Operator):
+    bl_idname = "object.bf_bs_stage_high"
+    bl_label = "Stage Highs"
+    bl_description = "Swap '_high' meshes for bounding box or decimated proxies to keep the viewport fast, exports still use the full meshes"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT'
+
+    def execute(self, context):
+        properties = context.scene.BF_BS_Properties
+        start = time.perf_counter()
+        staged = stage_objects(scene_highs(context), properties.proxy_type, properties.proxy_resolution)
+        self.report({'INFO'}, f"{staged} high meshes staged in {time.perf_counter() - start:.2f}s")
+        return {'FINISHED'}
+
+# Operator to give staged '_high' objects their full meshes back
+class BF_BS_UnstageHigh(bpy.types.Operator):
+    bl_idname = "object.bf_bs_unstage_high"
+    bl_label = "Restore Highs"
+    bl_description = "Give every staged object its full-resolution mesh back"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT'
+
+    def execute(self, context):
+        # every staged object, also the ones renamed out of the '_high' bucket since
+        restored = unstage_objects([obj for obj in context.scene.objects if has_staging(obj)])
+        self.report({'INFO'}, f"{restored} high meshes restored")
         return {'FINISHED'}
     
 #-----------Exporter-----------#
 
 
+# suffixes grouped by a batch export, one file per suffix
+EXPORT_SUFFIXES = ("_high", "_low")
+
+FBX_SETTINGS = dict(use_selection=True)
+POSE_FBX_SETTINGS = dict(
+    use_selection=True,
+    object_types={'MESH'},          # same for both; for original you can omit or keep
+    global_scale=1.0,
+    apply_unit_scale=False,         # disable unit scaling
+    apply_scale_options='FBX_SCALE_NONE',  # no extra scaling
+    bake_space_transform=False,     # don't bake extra transforms in exporter
+    axis_forward='-Z',
+    axis_up='Y',
+    path_mode='AUTO',
+    add_leaf_bones=False,
+    bake_anim=False,
+)
+# recorded in the export manifest, the OBJ writer has no options of its own
+OBJ_SETTINGS = dict(mesh_format='OBJ', axis_forward='-Z', axis_up='Y')
+
 class BF_BS_Export(bpy.types.Operator):
     bl_idname = "object.export_selected_operator"
     bl_label = "Export Selected To Files"
     bl_description = "Export selected objects with a specific suffix to FBX files"
     
     suffix_to_export: bpy.props.StringProperty(name="Suffix to Export")
+    batch: bpy.props.BoolProperty(
+        name="Batch",
+        description="Export every suffix group of the selection (_high, _low) in one pass",
+        default=False
+    )
+    name: bpy.props.StringProperty(
+        name="Name",
+        description="Base name of the exported files, the Files Name setting when empty",
+        default=""
+    )
+    force: bpy.props.BoolProperty(
+        name="Force",
+        description="Export even when the meshes did not change since the last export",
+        default=False
+    )
 
     @classmethod
     def poll(cls, context):
         return context.mode == 'OBJECT'
 
+    def _base_name(self, properties) -> str:
+        return self.name or properties.Name
+
     def _resolve_export_path(self, properties, suffix_to_export: str):
+        extension = properties.mesh_format.lower()
+        name = self._base_name(properties)
         if properties.ExportPath:
-            return os.path.join(properties.ExportPath.strip(), f"{properties.Name}{suffix_to_export}.fbx")
-        return os.path.join(os.path.dirname(bpy.data.filepath), f"{properties.Name}{suffix_to_export}.fbx")
+            return os.path.join(properties.ExportPath.strip(), f"{name}{suffix_to_export}.{extension}")
+        return os.path.join(os.path.dirname(bpy.data.filepath), f"{name}{suffix_to_export}.{extension}")
+
+    @staticmethod
+    def _export_settings(properties) -> dict:
+        if properties.mesh_format == 'OBJ':
+            return OBJ_SETTINGS
+        return POSE_FBX_SETTINGS if properties.exported_in_pose else FBX_SETTINGS
 
     def _validate(self, properties, selected_objects, export_path):
         if not selected_objects:
             self.report({'WARNING'}, "No selected objects match the suffix filter.")
             return False
-        if not properties.Name.strip():
+        if not self._base_name(properties).strip():
             self.report({'ERROR'}, "Name cannot be empty. Please provide a name.")
             return False
         export_dir = os.path.dirname(export_path)
@@ -228,97 +410,98 @@ class BF_BS_Export(bpy.types.Operator):
             return False
         return True
 
-    def _export_original_workflow(self, selected_objects, export_path):
-        # Store and adjust selection
-        original_selection = list(bpy.context.selected_objects)
-        original_active = bpy.context.view_layer.objects.active
-
-        bpy.ops.object.select_all(action='DESELECT')
+    @staticmethod
+    def _group_by_suffix(objects, suffixes):
+        # single scan of the selection, an object lands in every group its name matches
+        groups = {suffix: [] for suffix in suffixes}
+        for obj in objects:
+            buckets = INDEX.buckets_of(obj)
+            for suffix in suffixes:
+                # suffixes the index does not bucket (custom or empty) keep the plain substring match
+                if suffix in buckets if suffix in SUFFIXES else suffix in obj.name.lower():
+                    groups[suffix].append(obj)
+        return {suffix: objs for suffix, objs in groups.items() if objs}
+
+    def _export_original_workflow(self, selected_objects, export_path, settings=FBX_SETTINGS):
+        # Selection is stored and restored once by _export_groups
         for obj in selected_objects:
             obj.select_set(True)
 
         try:
-            bpy.ops.export_scene.fbx(filepath=export_path, use_selection=True)
+            bpy.ops.export_scene.fbx(filepath=export_path, **settings)
         except PermissionError:
             self.report({'ERROR'}, f"Permission denied: Unable to write to {export_path}.")
             return {'CANCELLED'}
         finally:
-            # Restore selection
-            bpy.ops.object.select_all(action='DESELECT')
-            for o in original_selection:
-                if o and o.name in bpy.data.objects:
-                    o.select_set(True)
-            if original_active and original_active.name in bpy.data.objects:
-                bpy.context.view_layer.objects.active = original_active
+            for obj in selected_objects:
+                if obj and obj.name in bpy.data.objects:
+                    obj.select_set(False)
 
         return {'FINISHED'}
 
     def _export_baked_pose_meshes(self, selected_objects, export_path, context):
-        # Build temp posed meshes from depsgraph
+        # object_types={'MESH'} exports no armature, so the FBX exporter leaves it in its current pose and
+        # writes the evaluated, posed meshes itself: no temp copies of the meshes are needed
+        if not any(obj.type == 'MESH' for obj in selected_objects):
+            self.report({'ERROR'}, "No mesh objects to export in pose.")
+            return {'CANCELLED'}
+        peak_before = peak_memory_mb()
+        try:
+            return self._export_original_workflow(selected_objects, export_path, POSE_FBX_SETTINGS)
+        finally:
+            peak_after = peak_memory_mb()
+            if peak_before is not None and peak_after is not None:
+                self.report({'INFO'}, f"Pose export peak RAM: {peak_before:.0f} MB before, {peak_after:.0f} MB after")
+
+    def _export_obj(self, selected_objects, export_path, context, in_pose: bool):
+        # Streams the evaluated meshes straight to disk, no selection needed
+        try:
+            write_obj(export_path, selected_objects, context.evaluated_depsgraph_get(), in_pose=in_pose)
+        except PermissionError:
+            self.report({'ERROR'}, f"Permission denied: Unable to write to {export_path}.")
+            return {'CANCELLED'}
+        except OSError as e:
+            self.report({'ERROR'}, f"Unable to write {export_path}: {e}")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+    def _pending_groups(self, context, properties, groups):
+        """(export_path, objects, manifest) of the groups that changed since their last export."""
+        force = self.force or properties.force_export
+        settings = self._export_settings(properties)
         depsgraph = context.evaluated_depsgraph_get()
 
-        original_selection = list(bpy.context.selected_objects)
+        pending = []
+        for suffix, objects in groups.items():
+            export_path = self._resolve_export_path(properties, suffix)
+            manifest = export_fingerprint(objects, dict(settings, exported_in_pose=properties.exported_in_pose),
+                                          depsgraph, evaluated=properties.exported_in_pose)
+            if not force and export_is_current(export_path, manifest):
+                self.report({'INFO'}, f"Unchanged, skipped: {export_path}")
+                continue
+            pending.append((export_path, objects, manifest))
+        return pending
+
+    def _export_groups(self, context, properties, pending):
+        """Export every pending group, storing and restoring the selection only once."""
+        original_selection = list(context.selected_objects)
         original_active = context.view_layer.objects.active
 
-        temp_objects = []
         try:
             bpy.ops.object.select_all(action='DESELECT')
-
-            for obj in selected_objects:
-                if obj.type != 'MESH':
-                    continue
-
-                eval_obj = obj.evaluated_get(depsgraph)
-                new_me = bpy.data.meshes.new_from_object(
-                    eval_obj,
-                    preserve_all_data_layers=True,
-                    depsgraph=depsgraph
-                )
-
-                new_obj = bpy.data.objects.new(f"{obj.name}_POSEBAKED", new_me)
-                new_obj.matrix_world = obj.matrix_world
-
-                link_target = obj.users_collection[0] if obj.users_collection else context.collection
-                link_target.objects.link(new_obj)
-
-                for m in list(new_obj.modifiers):
-                    new_obj.modifiers.remove(m)
-
-                new_obj.select_set(True)
-                temp_objects.append(new_obj)
-
-            if not temp_objects:
-                self.report({'ERROR'}, "No mesh objects to export after baking.")
-                return {'CANCELLED'}
-
-            try:
-                bpy.ops.export_scene.fbx(
-                    filepath=export_path,
-                    use_selection=True,
-                    object_types={'MESH'},          # same for both; for original you can omit or keep
-                    global_scale=1.0,
-                    apply_unit_scale=False,         # disable unit scaling
-                    apply_scale_options='FBX_SCALE_NONE',  # no extra scaling
-                    bake_space_transform=False,     # don't bake extra transforms in exporter
-                    axis_forward='-Z',
-                    axis_up='Y',
-                    path_mode='AUTO',
-                    add_leaf_bones=False,
-                    bake_anim=False,
-                )
-            except PermissionError:
-                self.report({'ERROR'}, f"Permission denied: Unable to write to {export_path}.")
-                return {'CANCELLED'}
-
+            for export_path, objects, manifest in pending:
+                start = time.perf_counter()
+                if properties.mesh_format == 'OBJ':
+                    result = self._export_obj(objects, export_path, context, properties.exported_in_pose)
+                elif properties.exported_in_pose:
+                    result = self._export_baked_pose_meshes(objects, export_path, context)
+                else:
+                    result = self._export_original_workflow(objects, export_path)
+                if result != {'FINISHED'}:
+                    return result
+                write_manifest(export_path, manifest)
+                self.report({'INFO'}, f"Exported {len(objects)} objects to: {export_path} in {time.perf_counter() - start:.2f}s")
         finally:
-            # Cleanup temp objects
-            if temp_objects:
-                bpy.ops.object.select_all(action='DESELECT')
-                for o in temp_objects:
-                    if o and o.name in bpy.data.objects:
-                        o.select_set(True)
-                bpy.ops.object.delete()
-
             # Restore selection
             bpy.ops.object.select_all(action='DESELECT')
             for o in original_selection:
@@ -329,50 +512,105 @@ class BF_BS_Export(bpy.types.Operator):
 
         return {'FINISHED'}
 
-    def execute(self, context):
-        properties = context.scene.BF_BS_Properties
-        if properties is None:
-            self.report({'ERROR'}, "Scene properties 'BF_BS_Properties' not found.")
+    def _start_background_export(self, context, properties, pending):
+        settings = self._export_settings(properties)
+        self._job = BackgroundExport([(export_path, objects, settings) for export_path, objects, _ in pending])
+        self._manifests = [(export_path, manifest) for export_path, _, manifest in pending]
+        self._start = time.perf_counter()
+        try:
+            self._job.start(context)
+        except (OSError, RuntimeError) as e:
+            self.report({'ERROR'}, f"Could not start the background export: {e}")
             return {'CANCELLED'}
 
-        suffix_to_export = (self.suffix_to_export or "").lower()
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.25, window=context.window)
+        wm.progress_begin(0, self._job.total)
+        wm.modal_handler_add(self)
+        self.report({'INFO'}, f"Exporting {self._job.total} files in the background")
+        return {'RUNNING_MODAL'}
+
+    def _end_background_export(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self._job.cancel()
+            self._end_background_export(context)
+            self.report({'WARNING'}, "Background export cancelled")
+            return {'CANCELLED'}
 
-        # Filter currently selected objects by suffix
-        selected_objects = [
-            obj for obj in context.selected_objects
-            if suffix_to_export in obj.name.lower()
-        ]
+        if event.type != 'TIMER' or event.timer != self._timer:
+            return {'PASS_THROUGH'}
 
-        export_path = self._resolve_export_path(properties, suffix_to_export)
-        self.report({'INFO'}, f"Export Path: {export_path}")
+        finished = self._job.poll()
+        context.window_manager.progress_update(self._job.done)
+        context.workspace.status_text_set(f"BakeFlow: exporting in the background {self._job.done}/{self._job.total} files (Esc to cancel)")
+        if not finished:
+            return {'PASS_THROUGH'}
 
-        if not self._validate(properties, selected_objects, export_path):
+        self._end_background_export(context)
+        if self._job.failed:
+            self.report({'ERROR'}, self._job.error)
             return {'CANCELLED'}
+        for export_path, manifest in self._manifests:
+            write_manifest(export_path, manifest)
+        self.report({'INFO'}, f"Exported {self._job.total} files in the background in {time.perf_counter() - self._start:.2f}s")
+        return {'FINISHED'}
 
-        # Toggle based on BF_BS_Properties.exported_in_pose
-        exported_in_pose = properties.exported_in_pose
+    def execute(self, context):
+        properties = context.scene.BF_BS_Properties
+        if properties is None:
+            self.report({'ERROR'}, "Scene properties 'BF_BS_Properties' not found.")
+            return {'CANCELLED'}
 
-        if exported_in_pose:
-            result = self._export_baked_pose_meshes(selected_objects, export_path, context)
+        # Filter currently selected objects by suffix, in a single scan
+        if self.batch:
+            groups = self._group_by_suffix(context.selected_objects, EXPORT_SUFFIXES)
         else:
-            result = self._export_original_workflow(selected_objects, export_path)
+            suffix_to_export = (self.suffix_to_export or "").lower()
+            groups = self._group_by_suffix(context.selected_objects, (suffix_to_export,))
+
+        if not groups:
+            self.report({'WARNING'}, "No selected objects match the suffix filter.")
+            return {'CANCELLED'}
+
+        for suffix, objects in groups.items():
+            export_path = self._resolve_export_path(properties, suffix)
+            self.report({'INFO'}, f"Export Path: {export_path}")
+            if not self._validate(properties, objects, export_path):
+                return {'CANCELLED'}
 
-        if result == {'FINISHED'}:
-            self.report({'INFO'}, f"Exported successfully to: {export_path}")
-        return result
+        # staged highs are exported, and fingerprinted, with their full meshes, the proxies come back right after
+        with full_resolution([obj for objects in groups.values() for obj in objects]):
+            pending = self._pending_groups(context, properties, groups)
+            if not pending:
+                return {'FINISHED'}
+            # the OBJ writer is fast enough to stay on the main thread
+            if properties.async_export and properties.mesh_format == 'FBX':
+                return self._start_background_export(context, properties, pending)
+            return self._export_groups(context, properties, pending)
 
 
 #-----------Register-----------#
 
 _classes = (
+    BF_BS_BatchRename,
     BF_BS_Renaming,
     BF_BS_SwitchSuffix,
     BF_BS_AddSuffix,
     BF_BS_TransferName,
+    BF_BS_PairHighLow,
+    BF_BS_SortHighLow,
     BF_BS_ShowLow,
     BF_BS_HideLow,
     BF_BS_ShowHigh,
     BF_BS_HideHigh,
+    BF_BS_StageHigh,
+    BF_BS_UnstageHigh,
     BF_BS_Export,
 )
 
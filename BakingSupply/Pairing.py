@@ -0,0 +1,147 @@
+﻿import time
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# High/low pairing by base name, then by the largest world bounding box overlap.
+
+SUFFIXES = ("_high", "_low")
+
+# a box spanning more cells than this is tested against every query instead of filling the grid
+MAX_CELLS_PER_BOX = 512
+
+@dataclass
+class BakeGroup:
+    name: str
+    low: str
+    highs: List[str] = field(default_factory=list)
+    spatial: List[str] = field(default_factory=list)    # highs matched by bounds, not by name
+
+@dataclass
+class PairingResult:
+    groups: List[BakeGroup]
+    unmatched_highs: List[str]
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        highs = sum(len(g.highs) for g in self.groups)
+        spatial = sum(len(g.spatial) for g in self.groups)
+        return (f"{len(self.groups)} groups, {highs} highs paired ({spatial} by bounds), "
+                f"{len(self.unmatched_highs)} unmatched, {self.seconds * 1000:.0f} ms")
+
+def base_name(name: str) -> Optional[str]:
+    """Lower-cased part of the name before its _high/_low suffix."""
+    lowered = name.lower()
+    for suffix in SUFFIXES:
+        index = lowered.find(suffix)
+        if index >= 0:
+            return lowered[:index]
+    return None
+
+class UniformGrid:
+    """Axis-aligned boxes bucketed in cubic cells, for overlap queries."""
+    def __init__(self, boxes: np.ndarray, cell: Optional[float] = None):
+        self.boxes = boxes                      # (n, 2, 3) min and max corners
+        extents = boxes[:, 1] - boxes[:, 0]
+        # typical part size: most boxes cover a handful of cells
+        self.cell = cell or max(float(np.median(extents.max(axis=1))) if len(boxes) else 1.0, 1e-6)
+        self.cells: Dict[Tuple[int, int, int], List[int]] = {}
+        self.oversize: List[int] = []
+        lo = np.floor(boxes[:, 0] / self.cell).astype(np.int64)
+        hi = np.floor(boxes[:, 1] / self.cell).astype(np.int64)
+        for index, (a, b) in enumerate(zip(lo, hi)):
+            if np.prod(b - a + 1) > MAX_CELLS_PER_BOX:
+                self.oversize.append(index)
+                continue
+            for key in self._keys(a, b):
+                self.cells.setdefault(key, []).append(index)
+
+    @staticmethod
+    def _keys(a, b):
+        for x in range(a[0], b[0] + 1):
+            for y in range(a[1], b[1] + 1):
+                for z in range(a[2], b[2] + 1):
+                    yield (x, y, z)
+
+    def candidates(self, box: np.ndarray) -> np.ndarray:
+        a = np.floor(box[0] / self.cell).astype(np.int64)
+        b = np.floor(box[1] / self.cell).astype(np.int64)
+        if np.prod(b - a + 1) > MAX_CELLS_PER_BOX:
+            return np.arange(len(self.boxes))
+        found = set(self.oversize)
+        for key in self._keys(a, b):
+            found.update(self.cells.get(key, ()))
+        return np.fromiter(found, dtype=np.int64, count=len(found))
+
+    def best_overlap(self, box: np.ndarray, among: Optional[np.ndarray] = None) -> int:
+        """Index of the box overlapping `box` with the largest volume, -1 if none touches it."""
+        candidates = self.candidates(box)
+        if among is not None:
+            candidates = np.intersect1d(candidates, among)
+        if not len(candidates):
+            return -1
+        others = self.boxes[candidates]
+        sizes = np.minimum(others[:, 1], box[1]) - np.maximum(others[:, 0], box[0])
+        touching = (sizes >= 0).all(axis=1)
+        if not touching.any():
+            return -1
+        # flat parts have zero volume: the epsilon keeps them ranked instead of tied at zero
+        volumes = np.where(touching, np.prod(sizes + 1e-9, axis=1), -1.0)
+        return int(candidates[int(volumes.argmax())])
+
+def pair_objects(names: Sequence[str], boxes: np.ndarray) -> PairingResult:
+    """Pair every _high to a _low: by base name, then by bounds overlap. boxes is (n, 2, 3) world min/max."""
+    start = time.perf_counter()
+    bases = [base_name(name) for name in names]
+    low_indices = [i for i, name in enumerate(names) if bases[i] is not None and "_low" in name.lower()]
+    high_indices = [i for i, name in enumerate(names) if bases[i] is not None and "_high" in name.lower()
+                    and "_low" not in name.lower()]
+
+    groups = [BakeGroup(names[i], names[i]) for i in low_indices]
+    lows_by_base: Dict[str, List[int]] = {}
+    for group_index, i in enumerate(low_indices):
+        lows_by_base.setdefault(bases[i], []).append(group_index)
+
+    low_boxes = boxes[low_indices] if low_indices else np.zeros((0, 2, 3))
+    grid = UniformGrid(low_boxes) if low_indices else None
+
+    unmatched = []
+    for i in high_indices:
+        same_base = lows_by_base.get(bases[i], [])
+        if len(same_base) == 1:
+            groups[same_base[0]].highs.append(names[i])
+            continue
+        # no low of that name, or several: the overlapping low decides (restricted to the namesakes if any)
+        best = -1
+        if grid is not None:
+            best = grid.best_overlap(boxes[i], np.array(same_base, dtype=np.int64) if same_base else None)
+        if best < 0:
+            unmatched.append(names[i])
+            continue
+        groups[best].highs.append(names[i])
+        if not same_base:
+            groups[best].spatial.append(names[i])
+
+    for group in groups:
+        group.name = base_name(group.low) or group.low
+    return PairingResult(groups, unmatched, time.perf_counter() - start)
+
+def benchmark_pairing(parts: int = 5000, seed: int = 0) -> PairingResult:
+    """Pair `parts` synthetic lows with two highs each, half of them misnamed so they go through the grid.
+
+    Run it from any Python with NumPy:
+        from BakeFlow.BakingSupply.Pairing import benchmark_pairing
+        print(benchmark_pairing().summary())
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(-100, 100, (parts, 3))
+    sizes = rng.uniform(0.2, 2.0, (parts, 3))
+    names, boxes = [], []
+    for i in range(parts):
+        names.append(f"part{i}_low")
+        boxes.append((centers[i] - sizes[i] / 2, centers[i] + sizes[i] / 2))
+        for j in range(2):
+            shrink = sizes[i] * 0.45
+            names.append(f"part{i}_high_{j:02}" if i % 2 else f"sculpt{i}_{j}_high")
+            boxes.append((centers[i] - shrink, centers[i] + shrink))
+    return pair_objects(names, np.asarray(boxes, dtype=np.float64))
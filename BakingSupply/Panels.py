@@ -20,11 +20,20 @@ class BF_BS_Panel(bpy.types.Panel):
         row = GoToLine(layout)
         row.operator("object.bf_bs_show_high_meshes", text="Show High")
         row.operator("object.bf_bs_show_low_meshes", text="Show Low")
+        row = GoToLine(layout)
+        row.operator("object.bf_bs_sort_high_low", text="Sort High/Low", icon='OUTLINER_COLLECTION')
+        row = GoToLine(layout)
+        row.operator("object.bf_bs_stage_high", text="Stage Highs")
+        row.operator("object.bf_bs_unstage_high", text="Restore Highs")
+        row = GoToLine(layout, align=False)
+        row.prop(properities, "proxy_type", text="")
+        if properities.proxy_type == 'DECIMATE':
+            row.prop(properities, "proxy_resolution", text="Cells")
         #Suffix Buttons
         layout.separator()
         
         row = GoToLine(layout, align=False)
-        row.operator("object.bf_bs_renaming_operator", text="Rename")
+        row.operator("object.bf_bs_batch_rename", text="Rename").mode = 'INDEX'
         row.prop(properities, "RenameName", text="")
         row.operator("object.bf_mt_openurl", text="", icon='HELP').url = "https://docs.marmoset.co/docs/baking-attributes/#quick-loader"
         
@@ -32,22 +41,33 @@ class BF_BS_Panel(bpy.types.Panel):
         col = layout.column(align=True)
         row = col.row(align=True)
         row.scale_y = 1.2
-        row.operator("object.bf_bs_add_suffix", text="Add _high").rename_type = "high"
-        row.operator("object.bf_bs_add_suffix", text="Add _low").rename_type = "low"
+        op = row.operator("object.bf_bs_batch_rename", text="Add _high")
+        op.mode, op.rename_type = 'ADD_SUFFIX', "high"
+        op = row.operator("object.bf_bs_batch_rename", text="Add _low")
+        op.mode, op.rename_type = 'ADD_SUFFIX', "low"
         
         row = GoToLine(layout, align=False)
-        row.operator("object.bf_bs_switch_suffix", text="High <> Low")
-        row.operator("object.bf_bs_transfer_name_suffix", text="Transfer Name")
+        row.operator("object.bf_bs_batch_rename", text="High <> Low").mode = 'SWITCH_SUFFIX'
+        row.operator("object.bf_bs_batch_rename", text="Transfer Name").mode = 'TRANSFER'
+        row = GoToLine(layout)
+        row.operator("object.bf_bs_pair_high_low", text="Pair High/Low", icon='LINKED')
         #Export Buttons
         layout.separator()
         row = GoToLine(layout, align=False)
         row.prop(properities, "Name", text="Files Name")
         row.prop(properities, "exported_in_pose", text="Export In Pose Mode", toggle=True)
+        row.prop(properities, "force_export", text="Force", toggle=True)
+        row.prop(properities, "async_export", text="Background", toggle=True)
+        
+        row = GoToLine(layout)
+        row.prop(properities, "mesh_format", expand=True)
         
         row = layout.row()
         row.scale_y = 1.5
         row.operator("object.export_selected_operator", text="Export High").suffix_to_export = "_high"
         row.operator("object.export_selected_operator", text="Export Low").suffix_to_export = "_low"
+        row = GoToLine(layout)
+        row.operator("object.export_selected_operator", text="Export High & Low").batch = True
 
                
         col= self.layout.column()
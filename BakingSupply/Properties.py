@@ -23,9 +23,44 @@ class BF_BS_Properties(bpy.types.PropertyGroup):
     )
     exported_in_pose: bpy.props.BoolProperty(
         name="Exported In Pose",
-        description="try to export in pose mode, warning, this will temporarily duplicate your mesh for the export so it's way more heavy on memory usage, especially with high poly meshes",
+        description="try to export in pose mode, the meshes are written as deformed by their armature in its current pose",
         default=False
     )
+    force_export: bpy.props.BoolProperty(
+        name="Force Export",
+        description="Always re-export, even when the meshes did not change since the last export",
+        default=False
+    )
+    mesh_format: bpy.props.EnumProperty(
+        name="Mesh Format",
+        description="File format of the exported bake meshes",
+        items=[
+            ('FBX', "FBX", "Export with Blender's FBX exporter"),
+            ('OBJ', "OBJ (Fast)", "Stream positions, normals, UVs and material groups straight to an OBJ file, much faster than the FBX exporter"),
+        ],
+        default='FBX'
+    )
+    async_export: bpy.props.BoolProperty(
+        name="Background Export",
+        description="Write the FBX files from a background Blender process so the interface does not freeze",
+        default=False
+    )
+    proxy_type: bpy.props.EnumProperty(
+        name="Proxy Type",
+        description="Stand-in shown for '_high' meshes while they are staged",
+        items=[
+            ('BOUNDS', "Bounds", "A box around each high mesh, the lightest proxy"),
+            ('DECIMATE', "Decimated", "A coarse copy of each high mesh, merged on a grid"),
+        ],
+        default='DECIMATE'
+    )
+    proxy_resolution: bpy.props.IntProperty(
+        name="Proxy Resolution",
+        description="Grid cells along the longest side of a high mesh for decimated proxies",
+        default=32,
+        min=2,
+        max=512
+    )
     
 _classes = (BF_BS_Properties,)
 
@@ -0,0 +1,50 @@
+﻿import numpy as np
+from typing import Tuple
+
+# Light viewport stand-ins for staged highs: a bounding box or a vertex-clustered copy.
+
+# box corners and faces, corner bit 0/1/2 picks max x/y/z
+_BOX_CORNERS = np.array([[(i >> a) & 1 for a in range(3)] for i in range(8)], dtype=np.int64)
+_BOX_FACES = np.array([
+    (0, 2, 3, 1), (4, 5, 7, 6),     # -z, +z
+    (0, 1, 5, 4), (2, 6, 7, 3),     # -y, +y
+    (0, 4, 6, 2), (1, 3, 7, 5),     # -x, +x
+], dtype=np.int32)
+
+def bounds_proxy(co: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(8, 3) corners and (6, 4) quads of the box around the (n, 3) positions co."""
+    box = np.stack((co.min(axis=0), co.max(axis=0))) if len(co) else np.zeros((2, 3), dtype=np.float32)
+    verts = box[_BOX_CORNERS, np.arange(3)]
+    return verts.astype(np.float32), _BOX_FACES.copy()
+
+def cluster_proxy(co: np.ndarray, tris: np.ndarray, materials: np.ndarray, cells: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vertex clustering decimation: snap every vertex to a grid with cells cells along the longest side,
+    merge the ones sharing a cell at their mean and drop the triangles that collapsed or repeat.
+
+    co is (n, 3), tris (m, 3) vertex indices and materials (m,) material indices.
+    Returns the clustered positions, triangles and their material indices.
+    """
+    if not len(co) or not len(tris):
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.int32), np.zeros(0, dtype=np.int32)
+    lo = co.min(axis=0)
+    size = max(float((co.max(axis=0) - lo).max()), 1e-8)
+    cell = size / max(cells, 1)
+    keys = np.floor((co - lo) / cell).astype(np.int64)
+    _, cluster, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    cluster = cluster.reshape(-1)
+
+    verts = np.zeros((len(counts), 3), dtype=np.float64)
+    np.add.at(verts, cluster, co)
+    verts /= counts[:, None]
+
+    mapped = cluster[tris]
+    keep = (mapped[:, 0] != mapped[:, 1]) & (mapped[:, 1] != mapped[:, 2]) & (mapped[:, 0] != mapped[:, 2])
+    mapped, materials = mapped[keep], materials[keep]
+    # same three clusters in any winding is the same triangle, keep the first one
+    _, first = np.unique(np.sort(mapped, axis=1), axis=0, return_index=True)
+    first.sort()
+    mapped, materials = mapped[first], materials[first]
+
+    # drop clusters no triangle uses any more
+    used, remap = np.unique(mapped, return_inverse=True)
+    return verts[used].astype(np.float32), remap.reshape(-1, 3).astype(np.int32), materials.astype(np.int32)
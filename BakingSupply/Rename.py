@@ -0,0 +1,47 @@
+﻿import re
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Pure rename planning: target names are computed for the whole batch first, collisions resolved
+# against the names that stay (and the ones already planned), then Functions.apply_renames assigns
+# them in two phases so no assignment ever collides and Blender never appends a .001.
+
+SUFFIX_PATTERN = re.compile(r'(_high|_low)', re.IGNORECASE)
+TRAILING_SUFFIX = re.compile(r'(_high|_low)$', re.IGNORECASE)
+
+def indexed_names(base: str, count: int) -> List[str]:
+    if count == 1:
+        return [base]
+    return [f"{base}_{i:02}" for i in range(1, count + 1)]
+
+def with_suffix(name: str, suffix: str) -> str:
+    """Replace a trailing _high/_low (if any) by _<suffix>."""
+    return f"{TRAILING_SUFFIX.sub('', name)}_{suffix}"
+
+def switched(name: str) -> str:
+    return SUFFIX_PATTERN.sub(lambda m: '_low' if m.group(1).lower() == '_high' else '_high', name)
+
+def transferred(name: str) -> Optional[str]:
+    """Active name with _high and _low swapped, None without either."""
+    if "_high" in name:
+        return name.replace("_high", "_low")
+    if "_low" in name:
+        return name.replace("_low", "_high")
+    return None
+
+def plan_names(targets: Sequence[Tuple[Hashable, str]], taken: Set[str]) -> Dict[Hashable, str]:
+    """Collision-free final name per key. taken holds the names that are not being renamed;
+    a target already used gets _01, _02... with one counter per target name."""
+    used = set(taken)
+    counters: Dict[str, int] = {}
+    plan = {}
+    for key, target in targets:
+        name = target
+        if name in used:
+            n = counters.get(target, 0)
+            while name in used:
+                n += 1
+                name = f"{target}_{n:02}"
+            counters[target] = n
+        used.add(name)
+        plan[key] = name
+    return plan
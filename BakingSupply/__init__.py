@@ -1 +1 @@
-﻿__all__ = ["Functions", "Operators", "Panels", "Properties"]
\ No newline at end of file
+﻿__all__ = ["Background", "Functions", "MeshWriter", "NameIndex", "Pairing", "Proxy", "Rename", "Operators", "Panels", "Properties"]
\ No newline at end of file
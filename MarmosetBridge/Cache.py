@@ -0,0 +1,70 @@
+﻿import hashlib, os
+from typing import List
+from . import Script
+from .Script import BakeSnapshot, build_marmoset_script
+
+# default size cap of the script cache directory
+CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# scripts built by another version of the generator must not be reused
+with open(Script.__file__, "rb") as _f:
+    GENERATOR_HASH = hashlib.blake2b(_f.read(), digest_size=8).hexdigest()
+
+def script_key(snap: BakeSnapshot) -> str:
+    """Content address of the script built from snap."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(GENERATOR_HASH.encode())
+    h.update(repr(snap).encode("utf-8"))
+    return h.hexdigest()
+
+class ScriptCache:
+    """Generated Toolbag scripts stored as `<key>.py` in one directory, least recently used evicted past max_bytes."""
+    def __init__(self, directory: str, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _entries(self) -> List[os.DirEntry]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [e for e in os.scandir(self.directory) if e.is_file() and e.name.endswith(".py")]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(e.stat().st_size for e in self._entries())
+
+    def script(self, snap: BakeSnapshot) -> str:
+        """Path of the script for snap, built and written only when it is not cached yet."""
+        path = os.path.join(self.directory, f"{script_key(snap)}.py")
+        if os.path.exists(path):
+            # mark as recently used
+            os.utime(path)
+            return path
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(build_marmoset_script(snap))
+        os.replace(path + ".tmp", path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: str = "") -> int:
+        """Remove the least recently used scripts until the directory fits in max_bytes, return its size."""
+        entries = sorted((e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        return total
+
+    def clear(self):
+        for e in self._entries():
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
@@ -1,18 +1,15 @@
-﻿import bpy, textwrap, subprocess, tempfile, os
-from pathlib import Path
+﻿import bpy
+import numpy as np
 from .Properties import MarmoConfig, Map_Types
-from .MapProperties import MAP_TYPE_TO_SETTINGS
-from typing import Callable, Dict, List, Optional
+from ..BakingSupply.NameIndex import INDEX, HIGH, LOW, classify
+from .Script import BakeSnapshot, MAP_TABLE, build_marmoset_script, toolbag_suffix
+from typing import Dict, Optional, Tuple
 
 def GoToLine(layout, *, scale_y=1.2, align=True):
     row = layout.row(align=align)
     row.scale_y = scale_y
     return row
 
-#ensure no error when wirte the path with 4 backslashes
-def win_raw(path: str) -> str:
-    return str(Path(path)).replace("\\", "\\\\")
-
 # ensure condition is true, otherwise raise a RuntimeError with the given message
 def ensure(cond: bool, msg: str):
     if not cond:
@@ -38,229 +35,96 @@ def next_unused_enum(container):
     return Map_Types[0][0]
 
 
-# ===================== Builder =====================
-
-# A simple utility class to build scripts or code snippets dynamically
-class ScriptBuilder:
-    def __init__(self):
-        self.parts: List[str] = []
-    def line(self, s: str): self.parts.append(s)
-    def line_if(self, cond: bool, s: str):
-        if cond: self.parts.append(s)
-    def assign(self, target: str, value_code: str):
-        self.parts.append(f"{target} = {value_code}")
-    def assign_if(self, cond: bool, target: str, value_code: str):
-        if cond: self.parts.append(f"{target} = {value_code}")
-    def section(self, text: str):
-        self.parts.append(textwrap.dedent(text).strip("\n"))
-    def build(self) -> str:
-        return "\n".join(self.parts) + "\n"
-
-# ===================== Sections =====================
-
-def sec_header(sb: ScriptBuilder):
-    sb.section("""
-    import mset
-    mset.newScene()
-    baker = mset.BakerObject()
-    """)
-
-def sec_imports(sb: ScriptBuilder, cfg: MarmoConfig):
-    if cfg.low_fbx:
-        sb.line_if(bool(cfg.low_fbx),  f'baker.importModel(r"{win_raw(cfg.low_fbx)}")')
-    if cfg.high_fbx:
-        sb.line_if(bool(cfg.high_fbx), f'baker.importModel(r"{win_raw(cfg.high_fbx)}")')
-
-def sec_core_params(sb: ScriptBuilder, cfg: MarmoConfig):
-    sb.assign("baker.outputPath",      f'r"{win_raw(cfg.export_path)}"')
-    sb.assign("baker.outputBits",      str(cfg.pixel_bits))
-    sb.assign("baker.outputSamples",   str(cfg.samples))
-    sb.assign("baker.outputWidth",     str(cfg.width))
-    sb.assign("baker.outputHeight",    str(cfg.height))
-    sb.assign("baker.edgePadding",     f'"{cfg.edge_padding}"')
-    sb.assign("baker.outputSoften",    str(cfg.soften))
-    sb.assign("baker.useHiddenMeshes", str(cfg.use_hidden_meshes))
-    sb.assign("baker.ignoreTransforms",str(cfg.ignore_transforms))
-    sb.assign("baker.smoothCage",      str(cfg.smooth_cage))
-    sb.assign("baker.ignoreBackfaces", str(cfg.ignore_backfaces))
-    sb.assign("baker.tileMode",        str(cfg.tile_mode))
-
-
-def sec_maps(sb: ScriptBuilder, cfg: MarmoConfig):
-    properties = bpy.context.scene.BF_MT_Properties #get the properties from the context
-    map_container = bpy.context.scene.BF_MT_MapContainer
-    enable_map_types = [item.map_type for item in map_container.maps if item.map_enable]
-    
-    sb.section("""
-    # Clear existing maps
-    existing_maps = baker.getAllMaps()
-    for m in existing_maps:
-        m.enabled = False
-    """)
-
-    if 'NORMAL' in enable_map_types:
-        sb.section(f"""
-
-        normal_map = baker.getMap("Normals")
-        normal_map.enabled = True
-        normal_map.suffix = "{str(bpy.context.scene.BF_MT_NormalSettings.suffix)[1:]}"
-                
-        #normal_map.flipX = {bpy.context.scene.BF_MT_NormalSettings.flip_x}
-        #normal_map.flipY = {bpy.context.scene.BF_MT_NormalSettings.flip_y}
-        #normal_map.flipZ = {bpy.context.scene.BF_MT_NormalSettings.flip_z}
-        
-        normal_map.flipZ = {bpy.context.scene.BF_MT_NormalSettings.flip_y} #swapping Y and Z to fix the normal flipping issue
-        
-        print("normal_map.flipY : ",normal_map.flipY)
-        """) #bug of flipping normal due to error in the api, Request made on marmoset server
-
-    
-    if 'NORMAL_OBJ' in enable_map_types:
-        sb.section(f"""
-        normal_obj_map = baker.getMap("Normals (Object)")
-        normal_obj_map.enabled = True
-        normal_obj_map.suffix = "{str(bpy.context.scene.BF_MT_NormalOBJSettings.suffix)[1:]}"
-        
-        normal_obj_map.flipX = {bpy.context.scene.BF_MT_NormalOBJSettings.flip_x}
-        normal_obj_map.flipY = {bpy.context.scene.BF_MT_NormalOBJSettings.flip_y}
-        normal_obj_map.flipZ = {bpy.context.scene.BF_MT_NormalOBJSettings.flip_z}
-        
-        """) #bug of flipping normal due to error in the api, Request made on marmoset server
-    
-    if 'HEIGHT' in enable_map_types:
-        sb.section(f"""
-        height_map = baker.getMap("Height")
-        height_map.enabled = True
-        height_map.suffix = "{str(bpy.context.scene.BF_MT_HeightSettings.suffix)[1:]}"
-        height_map.innerDistance = {bpy.context.scene.BF_MT_HeightSettings.inner_distance}
-        height_map.outerDistance = {bpy.context.scene.BF_MT_HeightSettings.outer_distance}
-        """)
-    
-    if 'POSITION' in enable_map_types:
-        sb.section(f"""
-        position_map = baker.getMap("Position")
-        position_map.enabled = True
-        position_map.suffix = "{str(bpy.context.scene.BF_MT_PositionSettings.suffix)[1:]}"
-        normalization_properities = "{str(bpy.context.scene.BF_MT_PositionSettings.normalization)}"
-        match normalization_properities:
-            case "BOUNDINGBOX":
-                position_map.normalization = "Bounding Box"
-            case "BOUNDINGSPHERE":
-                position_map.normalization = "Bounding Sphere"
-            case "DISABLED":
-                position_map.normalization = "Disabled"
-        """)
-            
-   
-    if 'CURVATURE' in enable_map_types:
-        sb.section(f"""
-        curvature_map = baker.getMap("Curvature")
-        curvature_map.enabled = True
-        curvature_map.suffix = "{str(bpy.context.scene.BF_MT_CurveSettings.suffix)[1:]}"
-        curvature_map.strength = {bpy.context.scene.BF_MT_CurveSettings.strength}
-        """)
-    
-    if 'THICKNESS' in enable_map_types:
-        sb.section(f"""
-        thickness_map = baker.getMap("Thickness")
-        thickness_map.enabled = True
-        thickness_map.suffix = "{str(bpy.context.scene.BF_MT_ThicknessSettings.suffix)[1:]}"
-        thickness_map.rayCount = {bpy.context.scene.BF_MT_ThicknessSettings.ray_count}
-        """)
-    
-    if 'AMBIANT_OCCLUSION' in enable_map_types:
-        sb.section(f"""
-        ao_map = baker.getMap("Ambient Occlusion")
-        ao_map.enabled = True
-        ao_map.suffix = "{str(bpy.context.scene.BF_MT_AOSettings.suffix)[1:]}"
-        ao_map.rayCount = {bpy.context.scene.BF_MT_AOSettings.ray_count}
-        ao_map.searchDistance = {bpy.context.scene.BF_MT_AOSettings.search_distance}
-        ao_map.cosineWeight = {bpy.context.scene.BF_MT_AOSettings.cavity_weight}
-        ao_map.floorOcclusion = {bpy.context.scene.BF_MT_AOSettings.floor_occlusion}
-        ao_map.floor = {bpy.context.scene.BF_MT_AOSettings.floor_strength}
-        ao_map.twoSided = {bpy.context.scene.BF_MT_AOSettings.two_sided}
-        ao_map.ignoreGroups = {bpy.context.scene.BF_MT_AOSettings.ignore_groups}
-        
-        """)
-    
-    if 'AMBIANT_OCCLUSION_2' in enable_map_types:
-        sb.section(f"""
-        ao2_map = baker.getMap("Ambient Occlusion (2)")
-        ao2_map.enabled = True
-        ao2_map.suffix = "{str(bpy.context.scene.BF_MT_AO2Settings.suffix)[1:]}"
-        ao2_map.rayCount = {bpy.context.scene.BF_MT_AO2Settings.ray_count}
-        ao2_map.searchDistance = {bpy.context.scene.BF_MT_AO2Settings.search_distance}
-        ao2_map.cosineWeight = {bpy.context.scene.BF_MT_AO2Settings.cavity_weight}
-        ao2_map.floorOcclusion = {bpy.context.scene.BF_MT_AO2Settings.floor_occlusion}
-        ao2_map.floor = {bpy.context.scene.BF_MT_AO2Settings.floor_strength}
-        ao2_map.twoSided = {bpy.context.scene.BF_MT_AO2Settings.two_sided}
-        ao2_map.ignoreGroups = {bpy.context.scene.BF_MT_AO2Settings.ignore_groups}
-        """)
-    
-    if 'OBJECT_ID' in enable_map_types:
-        sb.section(f"""
-        object_id_map = baker.getMap("Object ID")
-        object_id_map.enabled = True
-        """)
-        
-    if 'MATERIAL_ID' in enable_map_types:
-        sb.section(f"""
-        material_id_map = baker.getMap("Material ID")
-        material_id_map.enabled = True
-        """)
-    
-
-def sec_material_sync(sb: ScriptBuilder, cfg: MarmoConfig):
-    sb.section(f"""
-    all_objects = mset.getAllObjects()
-    # Filter materials
-    materials = [obj for obj in all_objects if isinstance(obj, mset.Material)]
-    # Find the material named "Default"
-    default_material = next((mat for mat in materials if mat.name == "Default"), None)
-    
-    if normal_map:
-        normal_map.flipY = {bpy.context.scene.BF_MT_NormalSettings.flip_y}
-        if default_material:
-            default_material.setProperty("normalFlipY", True)
-            print("Flip Y for normals enabled on Default material.")
-        else:
-            print("Default material not found.")
-    """)
-    
-def sec_bake_group(sb: ScriptBuilder, cfg: MarmoConfig):
-    if bpy.context.scene.BF_MT_Properties.OverideMaxOffset:
-        sb.section(f"""
-        all_objects = mset.getAllObjects()
-        TargetObjects = []
-        
-        for obj in all_objects:
-            if isinstance(obj, mset.BakerTargetObject):
-                TargetObjects.append(obj)
-            
-        for obj in TargetObjects:
-            obj.minOffset = 0.0
-            obj.maxOffset = {bpy.context.scene.BF_MT_Properties.MaxOffset}
-        """)
-
-def sec_finalize(sb: ScriptBuilder, cfg: MarmoConfig):
-    sb.line_if(cfg.quick_bake, "baker.bake()")
-    sb.line_if(cfg.quick_bake, "baker.applyPreviewMaterial()")
-    sb.line('print("Marmoset bake project created and models loaded.")')
-
-def build_marmoset_script(cfg: MarmoConfig, context) -> str:
-    sb = ScriptBuilder()
-    sec_header(sb)
-    sec_imports(sb, cfg)
-    sec_core_params(sb, cfg)
-
-    props = getattr(context.scene, "BF_MT_Properties", None)
-    if props and getattr(props, "SendMapSettings", False):
-        sec_maps(sb, cfg)
-    
-    #if bpy.data.scenes["Scene"].BF_MT_Properties.SendMapSettings :
-    #    sec_maps(sb, cfg)
-    
-    sec_bake_group(sb, cfg)
-    #sec_material_sync(sb, cfg)
-    sec_finalize(sb, cfg)
-    return sb.build()
\ No newline at end of file
+# ===================== Texture Sets =====================
+
+def bake_group_name(name: str) -> Optional[str]:
+    """Name of the baker group an object lands in: the part before '_high' or '_low', like Toolbag's quick loader.
+    Suffixes match in any case, the same as the name index the export goes through."""
+    buckets = classify(name)
+    suffix = HIGH if HIGH in buckets else LOW if LOW in buckets else None
+    return name[:name.lower().find(suffix)] if suffix else None
+
+def _dominant(values: np.ndarray) -> int:
+    return int(np.bincount(values).argmax()) if len(values) else 0
+
+def _dominant_material(obj) -> str:
+    me = obj.data
+    indices = np.empty(len(me.polygons), dtype=np.int32)
+    me.polygons.foreach_get("material_index", indices)
+    slots = obj.material_slots
+    index = _dominant(indices)
+    material = slots[index].material if index < len(slots) else None
+    return bpy.path.clean_name(material.name) if material else "default"
+
+def _dominant_udim(obj) -> str:
+    uv_layer = obj.data.uv_layers.active
+    if uv_layer is None or not len(uv_layer.data):
+        return "1001"
+    uv = np.empty(len(uv_layer.data) * 2, dtype=np.float32)
+    uv_layer.data.foreach_get("uv", uv)
+    uv = np.floor(uv.reshape(-1, 2)).astype(np.int64)
+    # tile holding the most UV corners, for islands straddling a border
+    tiles = np.clip(uv[:, 0], 0, 9) + 10 * np.clip(uv[:, 1], 0, 99)
+    return str(1001 + _dominant(tiles))
+
+def texture_sets(objects, source: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """Split the baker groups of objects into texture sets, by the dominant material or UDIM tile of their low mesh."""
+    key = _dominant_udim if source == 'UDIM' else _dominant_material
+    sets: Dict[str, set] = {}
+    for obj in objects:
+        group = bake_group_name(obj.name)
+        if obj.type != 'MESH' or group is None or LOW not in INDEX.buckets_of(obj):
+            continue
+        sets.setdefault(key(obj), set()).add(group)
+    return tuple((name, tuple(sorted(groups))) for name, groups in sorted(sets.items()))
+
+
+# ===================== Snapshot =====================
+
+def _snapshot_maps(scene) -> Tuple[Tuple[str, Tuple[Tuple[str, object], ...]], ...]:
+    """Read the enabled maps and their settings from the scene in one pass, in table order."""
+    enabled = {item.map_type for item in scene.BF_MT_MapContainer.maps if item.map_enable}
+    snapshot = []
+    for map_type, spec in MAP_TABLE.items():
+        if map_type not in enabled:
+            continue
+        group = getattr(scene, spec.settings) if spec.settings else None
+        values = {}
+        for _, prop in spec.attributes:
+            value = getattr(group, prop)
+            if prop == "suffix":
+                value = toolbag_suffix(value)
+            convert = spec.converters.get(prop)
+            values[prop] = convert(value) if convert else value
+        snapshot.append((map_type, tuple(values.items())))
+    return tuple(snapshot)
+
+def capture_settings(cfg: MarmoConfig, scene) -> BakeSnapshot:
+    """Read everything build_marmoset_script needs from the config and the scene, once."""
+    properties = scene.BF_MT_Properties
+    send_maps = bool(getattr(properties, "SendMapSettings", False))
+    return BakeSnapshot(
+        export_path=cfg.export_path,
+        width=cfg.width,
+        height=cfg.height,
+        pixel_bits=cfg.pixel_bits,
+        samples=cfg.samples,
+        low_fbx=cfg.low_fbx,
+        high_fbx=cfg.high_fbx,
+        edge_padding=cfg.edge_padding,
+        soften=cfg.soften,
+        use_hidden_meshes=cfg.use_hidden_meshes,
+        ignore_transforms=cfg.ignore_transforms,
+        smooth_cage=cfg.smooth_cage,
+        ignore_backfaces=cfg.ignore_backfaces,
+        tile_mode=cfg.tile_mode,
+        quick_bake=cfg.quick_bake,
+        profile_maps=cfg.profile_maps,
+        result_path=cfg.result_path,
+        override_max_offset=properties.OverideMaxOffset,
+        max_offset=properties.MaxOffset,
+        normal_flip_y=scene.BF_MT_NormalSettings.flip_y,
+        send_maps=send_maps,
+        maps=_snapshot_maps(scene) if send_maps else (),
+        texture_sets=tuple(cfg.texture_sets),
+    )
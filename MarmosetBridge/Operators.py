@@ -1,10 +1,15 @@
-﻿import bpy, os, subprocess, tempfile, textwrap
-from dataclasses import dataclass, field
-from pathlib import Path
+﻿import bpy, os, subprocess
 from typing import Callable, Dict, List, Optional
 from bl_operators.presets import AddPresetBase
-from .Functions import ensure, build_marmoset_script, get_prefs, get_path_abs, next_unused_enum
+from .Functions import ensure, build_marmoset_script, capture_settings, bake_group_name, texture_sets, get_prefs, next_unused_enum
 from .Properties import MarmoConfig
+from .Session import ToolbagSession
+from .Queue import BakeJob, BakeQueue, FAILED
+from . import Results
+from .Cache import ScriptCache
+from . import Process, WorkDir
+from ..BakingSupply.Background import RUNNING_EXPORTS
+from ..BakingSupply.NameIndex import INDEX, HIGH, LOW
 
 class BF_MT_HelpURL(bpy.types.Operator):
     bl_idname = "object.bf_mt_openurl"
@@ -102,29 +107,136 @@ class ExportService:
     @staticmethod
     def selection_probe(context):
         objs = context.selected_objects
-        high_sel = any("_high" in o.name for o in objs)
-        low_sel  = any("_low" in o.name for o in objs)
+        high_sel = INDEX.contains(objs, HIGH)
+        low_sel  = INDEX.contains(objs, LOW)
         return high_sel, low_sel
 
+    @staticmethod
+    def bake_sets(objects, group_by: str) -> Dict[str, list]:
+        """Group the _high/_low objects into bake sets, by name prefix or by collection."""
+        sets: Dict[str, list] = {}
+        for obj in objects:
+            group = bake_group_name(obj.name)
+            if group is None:
+                continue
+            if group_by == 'COLLECTION' and obj.users_collection:
+                key = obj.users_collection[0].name
+            else:
+                key = group
+            sets.setdefault(key, []).append(obj)
+        return sets
+
     @staticmethod
     def export_if_needed(context):
         high_sel, low_sel = ExportService.selection_probe(context)
-        if high_sel:
-            bpy.ops.object.export_selected_operator(suffix_to_export="_high")
-        if low_sel:
-            bpy.ops.object.export_selected_operator(suffix_to_export="_low")
+        if high_sel or low_sel:
+            # one scan and one selection save/restore for both files
+            bpy.ops.object.export_selected_operator(batch=True)
+
+def make_config(context, name: str, high_sel: bool, low_sel: bool, preset_name: Optional[str] = None, objects=None) -> MarmoConfig:
+    scene = context.scene
+    #addon_mod = bpy.context.preferences.addons.get(__package__)
+
+    marmoset_path = bpy.path.abspath(get_prefs().marmoset_path)
+    ensure(marmoset_path and os.path.exists(marmoset_path),
+           f"Marmoset Toolbag not found at: {marmoset_path}. Set the correct path in Preferences.")
+
+    ensure(bool(name.strip()), "Appellation cannot be empty. Please provide a name.")
+
+    #ref to Properties
+    properties = scene.BF_MT_Properties
+    properties_bs = scene.BF_BS_Properties
+
+    # Pick the mesh path base
+    meshes_folder = properties_bs.ExportPath.strip() if properties_bs.ExportPath.strip() else os.path.dirname(bpy.data.filepath)
+    mesh_ext = properties_bs.mesh_format.lower()
+    high_fbx = os.path.abspath(os.path.join(meshes_folder, f"{name}_high.{mesh_ext}"))
+    low_fbx  = os.path.abspath(os.path.join(meshes_folder, f"{name}_low.{mesh_ext}"))
+
+    ensure(high_sel or low_sel, "No selected objects with '_high' or '_low' in their names.")
+
+    # Choose bake output path
+    if properties.SamePathAsMesh:
+        if properties_bs.ExportPath:
+            base_path = properties_bs.ExportPath.strip()
+        else :
+            base_path = os.path.dirname(bpy.data.filepath)
+    else:
+        ensure(bool(properties.BakingPath.strip()), "No custom path set for the Baking.")
+        base_path = properties.BakingPath.strip()
+
+    
+    export_path = os.path.join(base_path, f"{name.strip()}.{properties.FileFormat.lower()}").replace("/", "\\")
+
+    cfg = MarmoConfig(
+        marmoset_path=marmoset_path,
+        export_path=export_path,
+        width=properties.ResolutionX,
+        height=properties.ResolutionY,
+        pixel_bits=properties.PixelDepth,
+        samples=properties.Samples,
+        low_fbx=low_fbx if low_sel else None,
+        high_fbx=high_fbx if high_sel else None,
+        normal_flip_y=False,
+        quick_bake=properties.DirectBake,
+        profile_maps=properties.ProfileMaps,
+        result_path=Results.result_path(name.strip()),
+    )
+
+    # one import, one output per texture set
+    if properties.TileMode == 'MULTI' and objects:
+        cfg.texture_sets = list(texture_sets(objects, properties.TextureSetSource))
+
+    # Apply a named preset if available
+    PresetRegistry.apply(preset_name, cfg)
+    return cfg
 
 class Launcher:
+    # generated scripts, reused while the setup does not change
+    script_cache = ScriptCache(WorkDir.scripts_dir())
+
     @staticmethod
-    def write_temp_script(code: str) -> str:
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".py")
-        with open(tmp.name, "w", encoding="utf-8") as f:
-            f.write(code)
-        return tmp.name
+    def launch_options(affinity=None) -> Process.LaunchOptions:
+        prefs = get_prefs()
+        return Process.LaunchOptions(
+            priority=prefs.worker_priority,
+            affinity=affinity,
+            log_dir=WorkDir.session_dir("logs") if prefs.capture_logs else None,
+        )
+
+    @staticmethod
+    def launch(marmoset_path: str, script_path: str) -> subprocess.Popen:
+        name = os.path.splitext(os.path.basename(script_path))[0]
+        return Process.launch([marmoset_path, "-py", script_path], name, Launcher.launch_options())
 
     @staticmethod
-    def launch(marmoset_path: str, script_path: str):
-        subprocess.Popen([marmoset_path, "-py", script_path], shell=True)
+    def launch_worker(marmoset_path: str, script_path: str, slot: int, workers: int) -> subprocess.Popen:
+        affinity = Process.cpu_slots(workers)[slot] if get_prefs().pin_workers else None
+        name = os.path.splitext(os.path.basename(script_path))[0]
+        return Process.launch([marmoset_path, "-py", script_path], name, Launcher.launch_options(affinity))
+
+    # last batch started by BF_MT_BatchBake, drawn by the panel
+    batch_queue: Optional[BakeQueue] = None
+
+    # long-lived Toolbag fed through a job directory, see Session.py
+    _session: Optional[ToolbagSession] = None
+
+    @classmethod
+    def session(cls, marmoset_path: str) -> ToolbagSession:
+        if cls._session is not None and cls._session.executable != marmoset_path:
+            cls._session.stop()
+            cls._session = None
+        if cls._session is None:
+            cls._session = ToolbagSession(marmoset_path, WorkDir.session_dir("toolbag"), options=cls.launch_options())
+        cls._session.start()
+        return cls._session
+
+    @classmethod
+    def stop_session(cls):
+        if cls._session is not None:
+            cls._session.stop()
+            WorkDir.remove(cls._session.job_dir)
+            cls._session = None
 
 # ===================== Blender Operator =====================
 
@@ -139,73 +251,203 @@ class BF_MT_ExportToMarmoset(bpy.types.Operator):
     )
 
     def _make_config(self, context) -> MarmoConfig:
-        scene = context.scene
-        #addon_mod = bpy.context.preferences.addons.get(__package__)
+        # ensure at least one of high or low is selected
+        high_sel, low_sel = ExportService.selection_probe(context)
+        return make_config(context, context.scene.BF_BS_Properties.Name, high_sel, low_sel, self.preset_name,
+                           objects=context.selected_objects)
 
-        marmoset_path = bpy.path.abspath(get_prefs().marmoset_path)
-        ensure(marmoset_path and os.path.exists(marmoset_path),
-               f"Marmoset Toolbag not found at: {marmoset_path}. Set the correct path in Preferences.")
+    def execute(self, context):
+        try:
+            cfg = self._make_config(context)
+        except RuntimeError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
 
-        ensure(bool(context.scene.BF_BS_Properties.Name.strip()), "Appellation cannot be empty. Please provide a name.")
+        # Export meshes if needed
+        ExportService.export_if_needed(context)
 
-        #ref to Properties
-        properties = scene.BF_MT_Properties
-        properties_bs = scene.BF_BS_Properties
+        # Build script (or reuse the cached one) and launch Toolbag
+        self._cfg = cfg
+        self._script_path = Launcher.script_cache.script(capture_settings(cfg, context.scene))
+
+        # Background exports still running: launch once their files are complete
+        self._exports = list(RUNNING_EXPORTS)
+        if self._exports:
+            self._timer = context.window_manager.event_timer_add(0.5, window=context.window)
+            context.window_manager.modal_handler_add(self)
+            return {'RUNNING_MODAL'}
+        return self._launch()
+
+    def _launch(self):
+        Results.watch(bpy.context.scene.BF_BS_Properties.Name.strip(), self._cfg.result_path)
+        if bpy.context.scene.BF_MT_Properties.PersistentSession:
+            with open(self._script_path, "r", encoding="utf-8") as f:
+                Launcher.session(self._cfg.marmoset_path).submit(f.read())
+            self.report({'INFO'}, "Bake setup sent to the running Marmoset Toolbag session.")
+            return {'FINISHED'}
+        Launcher.launch(self._cfg.marmoset_path, self._script_path)
+        self.report({'INFO'}, "Marmoset Toolbag launched and setup.")
+        return {'FINISHED'}
 
-        # Pick the mesh path base
-        meshes_folder = properties_bs.ExportPath.strip() if properties_bs.ExportPath.strip() else os.path.dirname(bpy.data.filepath)
-        high_fbx = os.path.abspath(os.path.join(meshes_folder, f"{properties_bs.Name}_high.fbx"))
-        low_fbx  = os.path.abspath(os.path.join(meshes_folder, f"{properties_bs.Name}_low.fbx"))
+    def modal(self, context, event):
+        if event.type != 'TIMER' or event.timer != self._timer:
+            return {'PASS_THROUGH'}
+        if not all(job.poll() for job in self._exports):
+            return {'PASS_THROUGH'}
 
-        # ensure at least one of high or low is selected
-        high_sel, low_sel = ExportService.selection_probe(context)
-        ensure(high_sel or low_sel, "No selected objects with '_high' or '_low' in their names.")
-
-        # Choose bake output path
-        if properties.SamePathAsMesh:
-            if properties_bs.ExportPath:
-                base_path = properties_bs.ExportPath.strip()
-            else :
-                base_path = os.path.dirname(bpy.data.filepath)
-        else:
-            ensure(bool(properties.BakingPath.strip()), "No custom path set for the Baking.")
-            base_path = properties.BakingPath.strip()
+        context.window_manager.event_timer_remove(self._timer)
+        failed = [job for job in self._exports if job.failed]
+        if failed:
+            self.report({'ERROR'}, f"Marmoset Toolbag not launched: {failed[0].error}")
+            return {'CANCELLED'}
+        return self._launch()
 
-        
-        export_path = os.path.join(base_path, f"{properties_bs.Name.strip()}.{properties.FileFormat.lower()}").replace("/", "\\")
-
-        cfg = MarmoConfig(
-            marmoset_path=marmoset_path,
-            export_path=export_path,
-            width=properties.ResolutionX,
-            height=properties.ResolutionY,
-            pixel_bits=properties.PixelDepth,
-            samples=properties.Samples,
-            low_fbx=low_fbx if low_sel else None,
-            high_fbx=high_fbx if high_sel else None,
-            normal_flip_y=False,
-            quick_bake=properties.DirectBake,
-        )
 
-        # Apply a named preset if available
-        PresetRegistry.apply(self.preset_name, cfg)
-        return cfg
+class BF_MT_BatchBake(bpy.types.Operator):
+    bl_idname = "object.bf_mt_batch_bake"
+    bl_label = "Batch Bake"
+    bl_description = "Export every high/low set of the selection and bake them on parallel Marmoset Toolbag processes"
+
+    preset_name: bpy.props.StringProperty(
+        name="Preset", description="Preset name to apply", default="asset_default"
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT'
+
+    def _build_jobs(self, context, sets, work_dir):
+        jobs = []
+        marmoset_path = None
+        original_selection = list(context.selected_objects)
+        original_active = context.view_layer.objects.active
+        try:
+            for name, objects in sets.items():
+                high_sel = INDEX.contains(objects, HIGH)
+                low_sel = INDEX.contains(objects, LOW)
+                cfg = make_config(context, name, high_sel, low_sel, self.preset_name, objects=objects)
+                # every worker bakes, then the wrapper quits Toolbag
+                cfg.quick_bake = True
+                marmoset_path = cfg.marmoset_path
+
+                bpy.ops.object.select_all(action='DESELECT')
+                for obj in objects:
+                    obj.select_set(True)
+                # a cancelled export leaves no (or a stale) mesh file behind, do not bake it
+                if 'CANCELLED' in bpy.ops.object.export_selected_operator(batch=True, name=name):
+                    self.report({'WARNING'}, f"Export of '{name}' failed, set skipped")
+                    continue
+
+                script_path = os.path.join(work_dir, f"{WorkDir.file_stem(name)}.py")
+                with open(script_path, "w", encoding="utf-8") as f:
+                    f.write(build_marmoset_script(capture_settings(cfg, context.scene)))
+                jobs.append(BakeJob(name, script_path))
+                Results.watch(name, cfg.result_path)
+        finally:
+            bpy.ops.object.select_all(action='DESELECT')
+            for o in original_selection:
+                if o and o.name in bpy.data.objects:
+                    o.select_set(True)
+            if original_active and original_active.name in bpy.data.objects:
+                context.view_layer.objects.active = original_active
+        return jobs, marmoset_path
 
     def execute(self, context):
+        properties = context.scene.BF_MT_Properties
+        sets = ExportService.bake_sets(context.selected_objects, properties.BatchGroupBy)
+        if not sets:
+            self.report({'ERROR'}, "No selected objects with '_high' or '_low' in their names.")
+            return {'CANCELLED'}
+
+        self._work_dir = WorkDir.new_job_dir("batch_")
         try:
-            cfg = self._make_config(context)
+            jobs, marmoset_path = self._build_jobs(context, sets, self._work_dir)
         except RuntimeError as e:
+            WorkDir.remove(self._work_dir)
             self.report({'ERROR'}, str(e))
             return {'CANCELLED'}
+        if not jobs:
+            WorkDir.remove(self._work_dir)
+            self.report({'ERROR'}, "Every export failed, nothing to bake")
+            return {'CANCELLED'}
 
-        # Export meshes if needed
-        ExportService.export_if_needed(context)
+        workers = properties.BatchMaxWorkers
+        self._queue = BakeQueue(
+            jobs,
+            launch=lambda script_path, slot: Launcher.launch_worker(marmoset_path, script_path, slot, workers),
+            max_workers=workers,
+            max_retries=properties.BatchMaxRetries,
+        )
+        Launcher.batch_queue = self._queue
+        # background exports must be complete before their set is baked
+        self._exports = list(RUNNING_EXPORTS)
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(1.0, window=context.window)
+        wm.modal_handler_add(self)
+        self.report({'INFO'}, f"Batch bake of {len(jobs)} sets started")
+        return {'RUNNING_MODAL'}
+
+    def _end(self, context, keep_files=False):
+        context.window_manager.event_timer_remove(self._timer)
+        if not keep_files:
+            WorkDir.remove(self._work_dir)
+        context.workspace.status_text_set(None)
+        for area in context.screen.areas:
+            area.tag_redraw()
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self._queue.cancel()
+            self._end(context)
+            self.report({'WARNING'}, f"Batch bake cancelled: {self._queue.summary()}")
+            return {'CANCELLED'}
 
-        # Build script and launch Toolbag
-        code = build_marmoset_script(cfg, context)
-        script_path = Launcher.write_temp_script(code)
-        Launcher.launch(cfg.marmoset_path, script_path)
-        self.report({'INFO'}, "Marmoset Toolbag launched and setup.")
+        if event.type != 'TIMER' or event.timer != self._timer:
+            return {'PASS_THROUGH'}
+        if not all(job.poll() for job in self._exports):
+            return {'PASS_THROUGH'}
+        if any(job.failed for job in self._exports):
+            self._queue.cancel()
+            self._end(context)
+            self.report({'ERROR'}, "Batch bake cancelled, the mesh export failed")
+            return {'CANCELLED'}
+
+        finished = self._queue.tick()
+        context.workspace.status_text_set(f"BakeFlow batch bake: {self._queue.summary()} (Esc to cancel)")
+        for area in context.screen.areas:
+            area.tag_redraw()
+        if not finished:
+            return {'PASS_THROUGH'}
+
+        failed = [job for job in self._queue.jobs if job.status == FAILED]
+        # failed jobs keep their scripts and tracebacks for inspection, the sweeper removes them later
+        self._end(context, keep_files=bool(failed))
+        if failed:
+            self.report({'ERROR'}, f"Batch bake: {self._queue.summary()}. Failed: " + ", ".join(f"{job.name} ({job.error})" for job in failed) + f". Scripts kept in {self._work_dir}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Batch bake: {self._queue.summary()}")
+        return {'FINISHED'}
+
+
+class BF_MT_ClearResults(bpy.types.Operator):
+    bl_idname = "object.bf_mt_clear_results"
+    bl_label = "Clear Bake Results"
+    bl_description = "Clear the bake results shown in the panel"
+
+    def execute(self, context):
+        Results.clear()
+        return {'FINISHED'}
+
+
+class BF_MT_StopSession(bpy.types.Operator):
+    bl_idname = "object.bf_mt_stop_session"
+    bl_label = "Stop Toolbag Session"
+    bl_description = "Close the persistent Marmoset Toolbag session"
+
+    def execute(self, context):
+        Launcher.stop_session()
+        self.report({'INFO'}, "Marmoset Toolbag session stopped.")
         return {'FINISHED'}
 
 
@@ -276,6 +518,9 @@ _classes = (
     BF_MT_Map_remove,
     BF_MT_Map_move,
     BF_MT_ExportToMarmoset,
+    BF_MT_BatchBake,
+    BF_MT_StopSession,
+    BF_MT_ClearResults,
     BF_MT_MapProperties_AddPreset,
     BF_MT_HelpURL,
 )
@@ -285,5 +530,6 @@ def register():
         bpy.utils.register_class(cls)
         
 def unregister():
+    Launcher.stop_session()
     for cls in reversed(_classes):
         bpy.utils.unregister_class(cls)
@@ -2,7 +2,8 @@
 from .Properties import BF_MT_MapItem
 from bl_ui.utils import PresetPanel
 from .Functions import GoToLine
-from .Operators import BF_MT_MapProperties_AddPreset
+from .Operators import BF_MT_MapProperties_AddPreset, Launcher
+from . import Results
 from .MapProperties import MAP_TYPE_TO_SETTINGS, BF_MT_NoSettings
 from pathlib import Path
 
@@ -37,6 +38,65 @@ class BF_MT_Panel(bpy.types.Panel):
         row = GoToLine(layout, align=False)
         row.prop(properties, "DirectBake", text="Quick Bake", toggle=True)
         row.prop(properties, "SendProperties", text="Send Properties", toggle=True)
+        sub = row.row()
+        sub.enabled = properties.DirectBake
+        sub.prop(properties, "ProfileMaps", text="Profile", toggle=True)
+        row = GoToLine(layout, align=False)
+        row.prop(properties, "PersistentSession", text="Keep Toolbag Open", toggle=True)
+        row.operator("object.bf_mt_stop_session", text="", icon='CANCEL')
+
+        if not properties.BatchOptions:
+            row = GoToLine(layout)
+            row.prop(properties, "BatchOptions", icon='TRIA_RIGHT', text="", emboss=False, toggle=True)
+            row.operator("object.bf_mt_batch_bake", text="Batch Bake", icon='RENDER_RESULT')
+        else:
+            box = layout.box()
+            row = box.row()
+            row.prop(properties, "BatchOptions", icon='TRIA_DOWN', text="", emboss=False, toggle=True)
+            row.operator("object.bf_mt_batch_bake", text="Batch Bake", icon='RENDER_RESULT')
+            row = GoToLine(box)
+            row.prop(properties, "BatchGroupBy", expand=True)
+            row = GoToLine(box)
+            row.prop(properties, "BatchMaxWorkers")
+            row.prop(properties, "BatchMaxRetries")
+            queue = Launcher.batch_queue
+            if queue is not None:
+                box.label(text=queue.summary())
+                for job in queue.jobs:
+                    row = box.row()
+                    row.label(text=job.name)
+                    row.label(text=job.status if not job.error else f"{job.status}: {job.error}")
+
+        if Results.RESULTS:
+            box = layout.box()
+            row = box.row()
+            row.label(text="Bake Results", icon='TIME')
+            row.operator("object.bf_mt_clear_results", text="", icon='X')
+            for name, result in Results.RESULTS.items():
+                row = box.row()
+                row.label(text=name)
+                row.label(text=result["status"])
+                if result.get("total_seconds") is not None:
+                    row.label(text=f'{result["total_seconds"]:.1f} s')
+                if result.get("error"):
+                    box.label(text=result["error"], icon='ERROR')
+                outputs = result.get("maps", [])
+                bake_seconds = result.get("bake_seconds") or 0.0
+                if any(output.get("seconds") is not None for output in outputs):
+                    # profiled bake: slowest maps first, with the settings that drive their cost
+                    outputs = sorted(outputs, key=lambda output: output.get("seconds") or 0.0, reverse=True)
+                for output in outputs:
+                    row = box.row()
+                    row.label(text=f'   {output.get("set", "")} {output["suffix"]}')
+                    if output.get("seconds") is not None:
+                        share = output["seconds"] / bake_seconds * 100 if bake_seconds else 0.0
+                        row.label(text=f'{output["seconds"]:.1f} s ({share:.0f}%)')
+                        settings = output.get("settings") or {}
+                        row.label(text=", ".join(f"{key} {value}" for key, value in settings.items()))
+                    if output.get("bytes"):
+                        row.label(text=f'{output["bytes"] / (1024 * 1024):.1f} MB')
+                    else:
+                        row.label(text="missing")
         layout.separator()
         
         if not properties.TexturePathOptions:
@@ -70,6 +130,9 @@ class BF_MT_Panel(bpy.types.Panel):
         row.prop(properties, "FileFormat")
         row = GoToLine(layout)
         row.prop(properties, "TileMode")
+        sub = row.row()
+        sub.enabled = properties.TileMode == 'MULTI'
+        sub.prop(properties, "TextureSetSource", text="")
         row = GoToLine(layout)
         row.prop(properties, "OverideMaxOffset")
         sub = row.row()
@@ -0,0 +1,81 @@
+﻿import os, subprocess, sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# ===================== Process Launcher =====================
+
+PRIORITIES = ("NORMAL", "BELOW_NORMAL", "LOW")
+
+# POSIX niceness per priority
+_NICENESS = {"NORMAL": 0, "BELOW_NORMAL": 5, "LOW": 15}
+
+def _windows_priority_flags(priority: str) -> int:
+    return {
+        "NORMAL": 0,
+        "BELOW_NORMAL": getattr(subprocess, "BELOW_NORMAL_PRIORITY_CLASS", 0),
+        "LOW": getattr(subprocess, "IDLE_PRIORITY_CLASS", 0),
+    }[priority]
+
+@dataclass(frozen=True)
+class LaunchOptions:
+    priority: str = "NORMAL"
+    affinity: Optional[Tuple[int, ...]] = None      # CPU indices, None for all
+    log_dir: Optional[str] = None                   # None leaves stdout/stderr attached to Blender's
+    env: Optional[Dict[str, str]] = None            # added to (and overriding) the current environment
+
+def cpu_slots(workers: int, cpu_count: Optional[int] = None) -> List[Tuple[int, ...]]:
+    """Split the CPUs into one contiguous, non-overlapping group per worker (shared round-robin past one per CPU)."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    workers = max(1, workers)
+    if workers > cpu_count:
+        return [(i % cpu_count,) for i in range(workers)]
+    size, extra = divmod(cpu_count, workers)
+    slots, start = [], 0
+    for i in range(workers):
+        end = start + size + (i < extra)
+        slots.append(tuple(range(start, end)))
+        start = end
+    return slots
+
+def _set_affinity(process: subprocess.Popen, cpus: Sequence[int]):
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(process.pid, cpus)
+    elif sys.platform == "win32":
+        import ctypes
+        mask = sum(1 << cpu for cpu in cpus)
+        ctypes.windll.kernel32.SetProcessAffinityMask(int(process._handle), mask)
+    # macOS has no affinity API: the hint is ignored
+
+def launch(command: List[str], name: str, options: LaunchOptions = LaunchOptions()) -> subprocess.Popen:
+    """Start command directly (no shell), logs in <log_dir>/<name>.out.log and .err.log."""
+    env = None
+    if options.env:
+        env = dict(os.environ)
+        env.update(options.env)
+
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = _windows_priority_flags(options.priority)
+
+    out = err = None
+    if options.log_dir:
+        os.makedirs(options.log_dir, exist_ok=True)
+        out = open(os.path.join(options.log_dir, f"{name}.out.log"), "wb")
+        err = open(os.path.join(options.log_dir, f"{name}.err.log"), "wb")
+    try:
+        process = subprocess.Popen(command, stdout=out, stderr=err, stdin=subprocess.DEVNULL, env=env, **kwargs)
+    finally:
+        # the child holds its own handles
+        for f in (out, err):
+            if f is not None:
+                f.close()
+
+    try:
+        if sys.platform != "win32" and _NICENESS[options.priority]:
+            os.setpriority(os.PRIO_PROCESS, process.pid, _NICENESS[options.priority])
+        if options.affinity:
+            _set_affinity(process, options.affinity)
+    except OSError:
+        # the process may already be gone, or the platform refuses: it still runs, unpinned
+        pass
+    return process
@@ -1,6 +1,6 @@
 ﻿import bpy, os, shutil
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from .MapProperties import *
 from .MapProperties import _MB_SYNC_GUARD
 
@@ -104,10 +104,35 @@ class BF_MT_Preferences(bpy.types.AddonPreferences):
         update=lambda self, context: bpy.ops.wm.restart_addon()  # Restart the addon to apply changes
     )
 
+    worker_priority: bpy.props.EnumProperty(
+        name="Toolbag Priority",
+        description="Process priority of the Toolbag instances started by BakeFlow",
+        items=[
+            ('NORMAL', "Normal", "Same priority as Blender"),
+            ('BELOW_NORMAL', "Below Normal", "Keep Blender responsive while baking"),
+            ('LOW', "Low", "Only use idle CPU time"),
+        ],
+        default='NORMAL'
+    )
+    pin_workers: bpy.props.BoolProperty(
+        name="Pin Batch Workers",
+        description="Give each batch bake worker its own share of the CPU cores (Windows and Linux)",
+        default=False
+    )
+    capture_logs: bpy.props.BoolProperty(
+        name="Capture Toolbag Logs",
+        description="Write the output of each Toolbag instance to log files in the BakeFlow work directory",
+        default=True
+    )
+
     def draw(self, context):
         layout = self.layout
         layout.label(text="Marmoset Toolbag Bridge Preferences")
         layout.prop(self, "marmoset_path")
+        layout.prop(self, "worker_priority")
+        row = layout.row()
+        row.prop(self, "pin_workers")
+        row.prop(self, "capture_logs")
 
 class BF_MT_Properties(bpy.types.PropertyGroup):
     #-----------Panel-----------#
@@ -122,6 +147,11 @@ class BF_MT_Properties(bpy.types.PropertyGroup):
         description="Toggle to enable or disable direct baking",
         default=False
     )
+    ProfileMaps: bpy.props.BoolProperty(
+        name="Profile Maps",
+        description="Bake each enabled map on its own and record its bake time and file size (slower, for tuning)",
+        default=False
+    )
     SendProperties: bpy.props.BoolProperty(
         name="Send Properties",
         description="Toggle to send or not Baker properties",
@@ -132,6 +162,40 @@ class BF_MT_Properties(bpy.types.PropertyGroup):
         description="Toggle to send or not Map properties",
         default=False
     )
+    PersistentSession: bpy.props.BoolProperty(
+        name="Persistent Session",
+        description="Keep one Marmoset Toolbag open and send each bake to it instead of launching Toolbag every time",
+        default=False
+    )
+    #-----------Batch-----------#
+    BatchOptions: bpy.props.BoolProperty(
+        name="Batch Options",
+        description="Show or hide batch bake options",
+        default=False
+    )
+    BatchGroupBy: bpy.props.EnumProperty(
+        name="Group By",
+        description="How the selected objects are split into bake sets",
+        items=[
+            ('PREFIX', "Name", "One set per name before '_high' or '_low'"),
+            ('COLLECTION', "Collection", "One set per collection"),
+        ],
+        default='PREFIX'
+    )
+    BatchMaxWorkers: bpy.props.IntProperty(
+        name="Workers",
+        description="Number of Marmoset Toolbag processes baking at the same time",
+        default=2,
+        min=1,
+        max=8
+    )
+    BatchMaxRetries: bpy.props.IntProperty(
+        name="Retries",
+        description="Number of times a failed bake is launched again",
+        default=1,
+        min=0,
+        max=5
+    )
     #-----------Baker-----------#
     BakingPath: bpy.props.StringProperty(
         name="Export Path",
@@ -178,6 +242,15 @@ class BF_MT_Properties(bpy.types.PropertyGroup):
         ],
         default='SINGLE'
     )
+    TextureSetSource: bpy.props.EnumProperty(
+        name="Texture Sets",
+        description="How the baker groups are split into texture sets",
+        items=[
+            ('MATERIAL', "Material", "One texture set per material, from the main material of each low mesh"),
+            ('UDIM', "UDIM", "One texture set per UDIM tile, from the tile holding most of each low mesh's UVs")
+        ],
+        default='MATERIAL'
+    )
     NonSquareTextures: bpy.props.BoolProperty(
         name="Non-Square Textures",
         description="Allow non-square textures",
@@ -326,6 +399,12 @@ class MarmoConfig:
     tile_mode: int = 0
     normal_flip_y: bool = False
     quick_bake: bool = False
+    # JSON written by the script with timings and outputs, see Results.py
+    result_path: Optional[str] = None
+    # bake the enabled maps one at a time to time them, only with quick_bake
+    profile_maps: bool = False
+    # (set name, (baker group names, ...)), one output per set from a single import
+    texture_sets: List[Tuple[str, Tuple[str, ...]]] = field(default_factory=list)
 
     # Maps toggles
     enable_ao: bool = True
@@ -0,0 +1,130 @@
+﻿import os, subprocess
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+# ===================== Bake Queue =====================
+
+QUEUED, RUNNING, DONE, FAILED = "QUEUED", "RUNNING", "DONE", "FAILED"
+
+# runs the bake, drops a .ok or .failed marker and always quits, so a job is over when its process exits
+WRAPPER_TEMPLATE = '''
+import traceback
+try:
+    with open({script!r}, "r", encoding="utf-8") as f:
+        exec(compile(f.read(), {script!r}, "exec"), {{"__name__": "__main__"}})
+    open({ok!r}, "w").close()
+except BaseException:
+    with open({failed!r}, "w", encoding="utf-8") as f:
+        f.write(traceback.format_exc())
+finally:
+    import mset
+    mset.quit()
+'''
+
+@dataclass
+class BakeJob:
+    name: str
+    script_path: str
+    status: str = QUEUED
+    attempts: int = 0
+    error: Optional[str] = None
+    # worker slot in [0, max_workers) while running, lets the launcher pin each slot to its own CPUs
+    slot: Optional[int] = None
+    process: Optional[subprocess.Popen] = field(default=None, repr=False)
+
+    @property
+    def ok_path(self) -> str:
+        return self.script_path + ".ok"
+
+    @property
+    def failed_path(self) -> str:
+        return self.script_path + ".failed"
+
+    @property
+    def wrapper_path(self) -> str:
+        return os.path.splitext(self.script_path)[0] + "_run.py"
+
+    def write_wrapper(self):
+        with open(self.wrapper_path, "w", encoding="utf-8") as f:
+            f.write(WRAPPER_TEMPLATE.format(script=self.script_path, ok=self.ok_path, failed=self.failed_path))
+
+class BakeQueue:
+    """Run BakeJobs with at most max_workers processes at once, retrying failed jobs up to max_retries times."""
+    def __init__(self, jobs: List[BakeJob], launch: Callable[[str, int], subprocess.Popen],
+                 max_workers: int = 2, max_retries: int = 1):
+        self.jobs = jobs
+        # launch(wrapper_path, slot) starts one Toolbag process on the given script
+        self.launch = launch
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(0, max_retries)
+
+    def count(self, status: str) -> int:
+        return sum(1 for job in self.jobs if job.status == status)
+
+    @property
+    def finished(self) -> bool:
+        return all(job.status in {DONE, FAILED} for job in self.jobs)
+
+    def summary(self) -> str:
+        return (f"{self.count(DONE)} done, {self.count(FAILED)} failed, "
+                f"{self.count(RUNNING)} running, {self.count(QUEUED)} queued")
+
+    def _start(self, job: BakeJob):
+        for path in (job.ok_path, job.failed_path):
+            if os.path.exists(path):
+                os.remove(path)
+        job.write_wrapper()
+        job.attempts += 1
+        job.status = RUNNING
+        used = {other.slot for other in self.jobs if other.status == RUNNING and other.slot is not None}
+        job.slot = min(set(range(self.max_workers)) - used)
+        try:
+            job.process = self.launch(job.wrapper_path, job.slot)
+        except OSError as e:
+            job.process = None
+            job.slot = None
+            self._fail(job, str(e))
+
+    def _fail(self, job: BakeJob, error: str):
+        job.error = error
+        # back in the queue while retries are left
+        job.status = QUEUED if job.attempts <= self.max_retries else FAILED
+
+    def _collect(self, job: BakeJob):
+        code = job.process.poll()
+        if code is None:
+            return
+        job.process = None
+        job.slot = None
+        if os.path.exists(job.ok_path):
+            job.status = DONE
+            job.error = None
+            return
+        error = f"exit code {code}"
+        if os.path.exists(job.failed_path):
+            with open(job.failed_path, "r", encoding="utf-8") as f:
+                lines = f.read().strip().splitlines()
+            error = lines[-1] if lines else error
+        self._fail(job, error)
+
+    def tick(self) -> bool:
+        """Collect finished processes and start queued jobs, return True once every job is over."""
+        for job in self.jobs:
+            if job.status == RUNNING and job.process is not None:
+                self._collect(job)
+        running = self.count(RUNNING)
+        for job in self.jobs:
+            if running >= self.max_workers:
+                break
+            if job.status == QUEUED:
+                self._start(job)
+                running += job.status == RUNNING
+        return self.finished
+
+    def cancel(self):
+        for job in self.jobs:
+            if job.status == RUNNING and job.process is not None:
+                job.process.terminate()
+            if job.status in {QUEUED, RUNNING}:
+                job.status = FAILED
+                job.error = "cancelled"
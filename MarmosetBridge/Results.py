@@ -0,0 +1,71 @@
+﻿import bpy, json, os
+from typing import Dict, Optional
+from . import WorkDir
+
+# ===================== Bake Results =====================
+#
+# The generated Toolbag script writes `<name>.json` once the scene is loaded (and baked, in Quick Bake):
+# status, load and bake seconds, the enabled maps with their output files, and the error if any.
+# A Blender timer polls the pending files and keeps the last result per bake name for the panel.
+
+RESULTS: Dict[str, dict] = {}
+_PENDING: Dict[str, str] = {}
+POLL_SECONDS = 1.0
+
+def result_path(name: str) -> str:
+    # one path per bake name, so an unchanged setup gives an unchanged script (see Cache.py)
+    return os.path.join(WorkDir.session_dir("results"), f"{WorkDir.file_stem(name)}.json")
+
+def read_result(path: str) -> Optional[dict]:
+    # the script writes a .tmp file then renames it, so an existing file is complete
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def _poll():
+    changed = False
+    for path, name in list(_PENDING.items()):
+        result = read_result(path)
+        if result is None:
+            continue
+        RESULTS[name] = result
+        del _PENDING[path]
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        changed = True
+    if changed:
+        _redraw()
+    return POLL_SECONDS if _PENDING else None
+
+def watch(name: str, path: str):
+    """Track the result file of a launched bake until Toolbag writes it."""
+    RESULTS[name] = {"name": name, "status": "WAITING", "maps": []}
+    # drop a result left over from a bake that was never picked up
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    _PENDING[path] = name
+    if not bpy.app.timers.is_registered(_poll):
+        bpy.app.timers.register(_poll, first_interval=POLL_SECONDS)
+
+def clear():
+    RESULTS.clear()
+    _PENDING.clear()
+
+def unregister():
+    if bpy.app.timers.is_registered(_poll):
+        bpy.app.timers.unregister(_poll)
+    clear()
@@ -0,0 +1,357 @@
+﻿import textwrap
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# ===================== Toolbag Script Generation =====================
+
+#ensure no error when wirte the path with 4 backslashes
+def win_raw(path: str) -> str:
+    return str(Path(path)).replace("\\", "\\\\")
+
+# ===================== Builder =====================
+
+# A simple utility class to build scripts or code snippets dynamically
+class ScriptBuilder:
+    def __init__(self):
+        self.parts: List[str] = []
+    def line(self, s: str): self.parts.append(s)
+    def line_if(self, cond: bool, s: str):
+        if cond: self.parts.append(s)
+    def assign(self, target: str, value_code: str):
+        self.parts.append(f"{target} = {value_code}")
+    def assign_if(self, cond: bool, target: str, value_code: str):
+        if cond: self.parts.append(f"{target} = {value_code}")
+    def section(self, text: str):
+        self.parts.append(textwrap.dedent(text).strip("\n"))
+    def build(self) -> str:
+        return "\n".join(self.parts) + "\n"
+
+# ===================== Snapshot =====================
+
+@dataclass(frozen=True, slots=True)
+class BakeSnapshot:
+    """Everything the generated script depends on, captured from the scene in one pass (see Functions.capture_settings).
+    Immutable and hashable: scripts can be built from it off the main thread, cached, and outside Blender."""
+    export_path: str
+    width: int
+    height: int
+    pixel_bits: str
+    samples: int
+    low_fbx: Optional[str] = None
+    high_fbx: Optional[str] = None
+    edge_padding: str = "Moderate"
+    soften: int = 0
+    use_hidden_meshes: bool = True
+    ignore_transforms: bool = False
+    smooth_cage: bool = True
+    ignore_backfaces: bool = True
+    tile_mode: int = 0
+    quick_bake: bool = False
+    profile_maps: bool = False
+    result_path: Optional[str] = None
+    override_max_offset: bool = False
+    max_offset: float = 0.0
+    normal_flip_y: bool = False
+    send_maps: bool = False
+    # (map type, ((property, value), ...)) for each enabled map, in MAP_TABLE order
+    maps: Tuple[Tuple[str, Tuple[Tuple[str, object], ...]], ...] = ()
+    # (set name, (baker group names, ...)) for each texture set, empty for a single output
+    texture_sets: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+
+# ===================== Sections =====================
+
+def sec_header(sb: ScriptBuilder):
+    sb.section("""
+    import json, os, time, traceback
+    _bf_t0 = time.time()
+    import mset
+    mset.newScene()
+    baker = mset.BakerObject()
+    """)
+
+def sec_imports(sb: ScriptBuilder, snap: BakeSnapshot):
+    if snap.low_fbx:
+        sb.line_if(bool(snap.low_fbx),  f'baker.importModel(r"{win_raw(snap.low_fbx)}")')
+    if snap.high_fbx:
+        sb.line_if(bool(snap.high_fbx), f'baker.importModel(r"{win_raw(snap.high_fbx)}")')
+
+def sec_core_params(sb: ScriptBuilder, snap: BakeSnapshot):
+    sb.assign("baker.outputPath",      f'r"{win_raw(snap.export_path)}"')
+    sb.assign("baker.outputBits",      str(snap.pixel_bits))
+    sb.assign("baker.outputSamples",   str(snap.samples))
+    sb.assign("baker.outputWidth",     str(snap.width))
+    sb.assign("baker.outputHeight",    str(snap.height))
+    sb.assign("baker.edgePadding",     f'"{snap.edge_padding}"')
+    sb.assign("baker.outputSoften",    str(snap.soften))
+    sb.assign("baker.useHiddenMeshes", str(snap.use_hidden_meshes))
+    sb.assign("baker.ignoreTransforms",str(snap.ignore_transforms))
+    sb.assign("baker.smoothCage",      str(snap.smooth_cage))
+    sb.assign("baker.ignoreBackfaces", str(snap.ignore_backfaces))
+    sb.assign("baker.tileMode",        str(snap.tile_mode))
+
+
+# ===================== Map Table =====================
+#
+# One row per Map_Types entry: the Toolbag map name, the script variable, the scene settings group
+# (a PointerProperty named after its class, see MapProperties) and the (Toolbag attribute, property)
+# pairs to copy. Converters turn a property value into what Toolbag expects.
+
+def toolbag_suffix(value: str) -> str:
+    return str(value)[1:]
+
+_POSITION_NORMALIZATION = {
+    "BOUNDINGBOX": "Bounding Box",
+    "BOUNDINGSPHERE": "Bounding Sphere",
+    "DISABLED": "Disabled",
+}
+
+_AO_ATTRIBUTES = (
+    ("suffix", "suffix"),
+    ("rayCount", "ray_count"),
+    ("searchDistance", "search_distance"),
+    ("cosineWeight", "cavity_weight"),
+    ("floorOcclusion", "floor_occlusion"),
+    ("floor", "floor_strength"),
+    ("twoSided", "two_sided"),
+    ("ignoreGroups", "ignore_groups"),
+)
+
+@dataclass(frozen=True)
+class MapSpec:
+    toolbag_name: str
+    variable: str
+    settings: Optional[str] = None
+    attributes: Tuple[Tuple[str, str], ...] = ()
+    converters: Dict[str, Callable[[object], object]] = field(default_factory=dict)
+    footer: str = ""
+
+MAP_TABLE: Dict[str, MapSpec] = {
+    'NORMAL': MapSpec(
+        "Normals", "normal_map", "BF_MT_NormalSettings",
+        # Toolbag API bug: its flipY lands on Z, so flip_y is sent as flipZ (request made on marmoset server)
+        (("suffix", "suffix"), ("flipZ", "flip_y")),
+        footer='print("normal_map.flipY : ",normal_map.flipY)',
+    ),
+    'NORMAL_OBJ': MapSpec(
+        "Normals (Object)", "normal_obj_map", "BF_MT_NormalOBJSettings",
+        (("suffix", "suffix"), ("flipX", "flip_x"), ("flipY", "flip_y"), ("flipZ", "flip_z")),
+    ),
+    'HEIGHT': MapSpec(
+        "Height", "height_map", "BF_MT_HeightSettings",
+        (("suffix", "suffix"), ("innerDistance", "inner_distance"), ("outerDistance", "outer_distance")),
+    ),
+    'POSITION': MapSpec(
+        "Position", "position_map", "BF_MT_PositionSettings",
+        (("suffix", "suffix"), ("normalization", "normalization")),
+        converters={"normalization": _POSITION_NORMALIZATION.get},
+    ),
+    'CURVATURE': MapSpec(
+        "Curvature", "curvature_map", "BF_MT_CurveSettings",
+        (("suffix", "suffix"), ("strength", "strength")),
+    ),
+    'THICKNESS': MapSpec(
+        "Thickness", "thickness_map", "BF_MT_ThicknessSettings",
+        (("suffix", "suffix"), ("rayCount", "ray_count")),
+    ),
+    'AMBIANT_OCCLUSION': MapSpec("Ambient Occlusion", "ao_map", "BF_MT_AOSettings", _AO_ATTRIBUTES),
+    'AMBIANT_OCCLUSION_2': MapSpec("Ambient Occlusion (2)", "ao2_map", "BF_MT_AO2Settings", _AO_ATTRIBUTES),
+    'OBJECT_ID': MapSpec("Object ID", "object_id_map"),
+    'MATERIAL_ID': MapSpec("Material ID", "material_id_map"),
+}
+
+def _compile_map_template(spec: MapSpec) -> str:
+    lines = [f"{spec.variable} = baker.getMap({spec.toolbag_name!r})", f"{spec.variable}.enabled = True"]
+    lines += [f"{spec.variable}.{attribute} = {{{prop}!r}}" for attribute, prop in spec.attributes]
+    if spec.footer:
+        lines.append(spec.footer)
+    return "\n".join(lines)
+
+# compiled once at import: sec_maps only formats them with the snapshot values
+MAP_TEMPLATES: Dict[str, str] = {map_type: _compile_map_template(spec) for map_type, spec in MAP_TABLE.items()}
+
+_CLEAR_MAPS = textwrap.dedent("""
+    # Clear existing maps
+    existing_maps = baker.getAllMaps()
+    for m in existing_maps:
+        m.enabled = False
+""").strip("\n")
+
+def sec_maps(sb: ScriptBuilder, snap: BakeSnapshot):
+    sb.line(_CLEAR_MAPS)
+    for map_type, values in snap.maps:
+        sb.line(MAP_TEMPLATES[map_type].format(**dict(values)))
+    
+
+def sec_material_sync(sb: ScriptBuilder, snap: BakeSnapshot):
+    sb.section(f"""
+    all_objects = mset.getAllObjects()
+    # Filter materials
+    materials = [obj for obj in all_objects if isinstance(obj, mset.Material)]
+    # Find the material named "Default"
+    default_material = next((mat for mat in materials if mat.name == "Default"), None)
+    
+    if normal_map:
+        normal_map.flipY = {snap.normal_flip_y}
+        if default_material:
+            default_material.setProperty("normalFlipY", True)
+            print("Flip Y for normals enabled on Default material.")
+        else:
+            print("Default material not found.")
+    """)
+    
+def sec_bake_group(sb: ScriptBuilder, snap: BakeSnapshot):
+    if snap.override_max_offset:
+        sb.section(f"""
+        all_objects = mset.getAllObjects()
+        TargetObjects = []
+        
+        for obj in all_objects:
+            if isinstance(obj, mset.BakerTargetObject):
+                TargetObjects.append(obj)
+            
+        for obj in TargetObjects:
+            obj.minOffset = 0.0
+            obj.maxOffset = {snap.max_offset}
+        """)
+
+# Defines _bf_bake(): one bake, one per map when profiling, repeated for each texture set.
+# Texture sets share the imported meshes: only the set's baker groups are shown, the output retargeted, then baked.
+_BAKE_TEMPLATE = textwrap.dedent("""
+    _bf_seconds = {{}}
+    _bf_sets = {sets!r}
+    _bf_stem, _bf_ext = os.path.splitext(baker.outputPath)
+    _bf_outputs = [(name, f"{{_bf_stem}}_{{name}}{{_bf_ext}}") for name, _ in _bf_sets] or [("", baker.outputPath)]
+
+    def _bf_bake_once(set_name):
+        if not {profile!r}:
+            baker.bake()
+            return
+        # one bake per enabled map, the others disabled, to time each map on its own
+        maps = [m for m in baker.getAllMaps() if m.enabled]
+        try:
+            for current in maps:
+                for m in maps:
+                    m.enabled = m is current
+                t = time.time()
+                baker.bake()
+                _bf_seconds[(set_name, current.suffix)] = round(time.time() - t, 3)
+        finally:
+            for m in maps:
+                m.enabled = True
+
+    def _bf_bake():
+        if not _bf_sets:
+            _bf_bake_once("")
+            return
+        groups = [o for o in mset.getAllObjects() if isinstance(o, mset.BakerTargetObject)]
+        base_path = baker.outputPath
+        # hidden groups would still be baked into every set
+        use_hidden = baker.useHiddenMeshes
+        baker.useHiddenMeshes = False
+        try:
+            for (name, members), (_, path) in zip(_bf_sets, _bf_outputs):
+                for group in groups:
+                    # OBJ exports replace whitespace in object names, compare the names the same way
+                    group.visible = "_".join(group.name.split()) in {{"_".join(m.split()) for m in members}}
+                baker.outputPath = path
+                _bf_bake_once(name)
+        finally:
+            baker.outputPath = base_path
+            baker.useHiddenMeshes = use_hidden
+            for group in groups:
+                group.visible = True
+""").strip("\n")
+
+def sec_bake(sb: ScriptBuilder, snap: BakeSnapshot):
+    sb.line(_BAKE_TEMPLATE.format(sets=snap.texture_sets, profile=snap.profile_maps))
+
+def sec_finalize(sb: ScriptBuilder, snap: BakeSnapshot):
+    if snap.result_path:
+        sec_result(sb, snap)
+        return
+    sb.line_if(snap.quick_bake, "_bf_bake()")
+    sb.line_if(snap.quick_bake, "baker.applyPreviewMaterial()")
+    sb.line('print("Marmoset bake project created and models loaded.")')
+
+# Map settings recorded with each output, the ones that drive bake time
+PROFILED_SETTINGS = ("rayCount", "searchDistance", "innerDistance", "outerDistance")
+
+# Bakes inside a try block and always writes the result file read back by Results.py
+def sec_result(sb: ScriptBuilder, snap: BakeSnapshot):
+    sb.section(f"""
+    def _bf_map_outputs():
+        outputs = []
+        for set_name, output_path in _bf_outputs:
+            stem, ext = os.path.splitext(output_path)
+            for m in baker.getAllMaps():
+                if not m.enabled:
+                    continue
+                path = f"{{stem}}_{{m.suffix}}{{ext}}"
+                outputs.append({{
+                    "set": set_name,
+                    "suffix": m.suffix,
+                    "path": path,
+                    "bytes": os.path.getsize(path) if os.path.exists(path) else None,
+                    "seconds": _bf_seconds.get((set_name, m.suffix)),
+                    "settings": {{key: getattr(m, key) for key in {PROFILED_SETTINGS!r} if hasattr(m, key)}},
+                }})
+        return outputs
+
+    def _bf_write_result(result):
+        path = r"{win_raw(snap.result_path)}"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    _bf_result = {{
+        "name": os.path.splitext(os.path.basename(baker.outputPath))[0],
+        "status": "LOADED",
+        "load_seconds": round(time.time() - _bf_t0, 3),
+        "bake_seconds": None,
+        "maps": [],
+        "error": None,
+    }}
+    try:
+    """)
+    if snap.quick_bake:
+        sb.line("    _bf_t1 = time.time()")
+        sb.line("    _bf_bake()")
+        sb.line('    _bf_result["bake_seconds"] = round(time.time() - _bf_t1, 3)')
+        sb.line('    _bf_result["status"] = "BAKED"')
+        sb.line("    baker.applyPreviewMaterial()")
+    else:
+        sb.line("    pass")
+    sb.section("""
+    except Exception:
+        _bf_result["status"] = "FAILED"
+        _bf_result["error"] = traceback.format_exc().strip().splitlines()[-1]
+        raise
+    finally:
+        _bf_result["maps"] = _bf_map_outputs()
+        _bf_result["total_seconds"] = round(time.time() - _bf_t0, 3)
+        _bf_write_result(_bf_result)
+    print("Marmoset bake project created and models loaded.")
+    """)
+    if snap.quick_bake and snap.profile_maps:
+        # keep the profile next to the textures, the result file is removed once read
+        sb.section("""
+        with open(os.path.splitext(baker.outputPath)[0] + ".profile.json", "w", encoding="utf-8") as f:
+            json.dump(_bf_result, f, indent=1)
+        """)
+
+def build_marmoset_script(snap: BakeSnapshot) -> str:
+    sb = ScriptBuilder()
+    sec_header(sb)
+    sec_imports(sb, snap)
+    sec_core_params(sb, snap)
+
+    if snap.send_maps:
+        sec_maps(sb, snap)
+
+    sec_bake_group(sb, snap)
+    #sec_material_sync(sb, snap)
+    sec_bake(sb, snap)
+    sec_finalize(sb, snap)
+    return sb.build()
@@ -0,0 +1,165 @@
+﻿import os, subprocess, time, uuid
+from typing import List, Optional
+from .Process import LaunchOptions, launch
+
+# ===================== Job Directory Protocol =====================
+#
+# The addon drops each bake script in the job directory as `<id>.job.py` (written to a .tmp name first,
+# then renamed, so a job is never picked up half written). The bootstrap running inside Toolbag polls
+# that directory, renames the job to `<id>.running`, executes it, then writes `<id>.done` or
+# `<id>.failed` (with the traceback), both through a .tmp name so a marker never appears empty. Job ids
+# sort in submission order. It refreshes `heartbeat` on every poll and exits when `stop` appears.
+# Nothing in this module imports bpy or mset: it runs the same against Toolbag or a plain Python stand-in.
+
+JOB_SUFFIX = ".job.py"
+PENDING, RUNNING, DONE, FAILED = "PENDING", "RUNNING", "DONE", "FAILED"
+
+BOOTSTRAP_TEMPLATE = '''
+import os, time, traceback
+
+JOB_DIR = {job_dir!r}
+POLL_SECONDS = {poll_seconds!r}
+
+def _poll():
+    with open(os.path.join(JOB_DIR, "heartbeat"), "w") as f:
+        f.write(str(time.time()))
+    if os.path.exists(os.path.join(JOB_DIR, "stop")):
+        return False
+    for name in sorted(os.listdir(JOB_DIR)):
+        if not name.endswith("{job_suffix}"):
+            continue
+        job_id = name[:-len("{job_suffix}")]
+        running = os.path.join(JOB_DIR, job_id + ".running")
+        try:
+            os.replace(os.path.join(JOB_DIR, name), running)
+        except OSError:
+            continue
+        with open(running, "r", encoding="utf-8") as f:
+            code = f.read()
+        try:
+            exec(compile(code, job_id, "exec"), {{"__name__": "__main__"}})
+        except BaseException:
+            marker, text = ".failed", traceback.format_exc()
+        else:
+            marker, text = ".done", ""
+        with open(os.path.join(JOB_DIR, job_id + ".marker.tmp"), "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(os.path.join(JOB_DIR, job_id + ".marker.tmp"), os.path.join(JOB_DIR, job_id + marker))
+        os.remove(running)
+    return True
+
+try:
+    import mset
+except ImportError:
+    mset = None
+
+if mset is not None and hasattr(mset, "callbacks"):
+    # inside Toolbag: poll from the periodic callback so the UI stays responsive between jobs
+    _last = [0.0]
+    def _on_update():
+        if time.time() - _last[0] < POLL_SECONDS:
+            return
+        _last[0] = time.time()
+        if not _poll():
+            mset.callbacks.onPeriodicUpdate = None
+            mset.quit()
+    mset.callbacks.onPeriodicUpdate = _on_update
+else:
+    # stand-in process: plain blocking loop
+    while _poll():
+        time.sleep(POLL_SECONDS)
+'''
+
+class ToolbagSession:
+    """A long-lived Toolbag process fed with bake scripts through a job directory."""
+    def __init__(self, executable: str, job_dir: str, script_flag: Optional[str] = "-py", poll_seconds: float = 0.5,
+                 options: LaunchOptions = LaunchOptions()):
+        self.executable = executable
+        self.job_dir = job_dir
+        # Toolbag takes its startup script as `-py <script>`, a Python stand-in takes it as the first argument
+        self.script_flag = script_flag
+        self.poll_seconds = poll_seconds
+        self.options = options
+        self._process: Optional[subprocess.Popen] = None
+        self._submitted = 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.job_dir, name)
+
+    def command(self, script_path: str) -> List[str]:
+        if self.script_flag:
+            return [self.executable, self.script_flag, script_path]
+        return [self.executable, script_path]
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        if self.is_alive():
+            return
+        os.makedirs(self.job_dir, exist_ok=True)
+        for name in os.listdir(self.job_dir):
+            if name == "stop" or name == "heartbeat":
+                os.remove(self._path(name))
+        bootstrap_path = self._path("bootstrap.py")
+        with open(bootstrap_path, "w", encoding="utf-8") as f:
+            f.write(BOOTSTRAP_TEMPLATE.format(job_dir=self.job_dir, poll_seconds=self.poll_seconds, job_suffix=JOB_SUFFIX))
+        self._process = launch(self.command(bootstrap_path), "session", self.options)
+
+    def submit(self, code: str) -> str:
+        """Queue a script, return its job id."""
+        # the counter keeps jobs of the same second in submission order, the bootstrap runs them sorted
+        self._submitted += 1
+        job_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{self._submitted:06}_{uuid.uuid4().hex[:8]}"
+        self.prune()
+        tmp_path = self._path(job_id + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(code)
+        os.replace(tmp_path, self._path(job_id + JOB_SUFFIX))
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        if os.path.exists(self._path(job_id + ".done")):
+            return DONE
+        if os.path.exists(self._path(job_id + ".failed")):
+            return FAILED
+        if os.path.exists(self._path(job_id + ".running")):
+            return RUNNING
+        return PENDING
+
+    def prune(self):
+        """Remove the markers of completed jobs, failed ones are kept for error()."""
+        if not os.path.isdir(self.job_dir):
+            return
+        for name in os.listdir(self.job_dir):
+            if name.endswith(".done"):
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+
+    def error(self, job_id: str) -> Optional[str]:
+        try:
+            with open(self._path(job_id + ".failed"), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> str:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status(job_id)
+            if status in {DONE, FAILED} or not self.is_alive():
+                return status
+            if deadline is not None and time.monotonic() > deadline:
+                return status
+            time.sleep(self.poll_seconds / 2)
+
+    def stop(self, timeout: float = 5.0):
+        if not self.is_alive():
+            return
+        open(self._path("stop"), "w").close()
+        try:
+            self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._process.terminate()
@@ -0,0 +1,88 @@
+﻿import bpy, hashlib, os, shutil, tempfile, time
+
+# ===================== BakeFlow Work Directory =====================
+#
+# Everything BakeFlow writes for Toolbag lives under <temp>/BakeFlow:
+#   scripts/             content-addressed script cache, size bounded on its own (see Cache.py)
+#   sessions/<id>/       one folder per Blender session: results, persistent session jobs, batch jobs
+# Each user removes its files once the bake completes. The sweeper run at registration removes
+# the session folders left behind by crashed or killed Blender sessions.
+
+ROOT = os.path.join(tempfile.gettempdir(), "BakeFlow")
+SESSIONS = os.path.join(ROOT, "sessions")
+SESSION_ID = f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+
+# sweeper limits: sessions older than this are removed, then the oldest until the total fits
+MAX_AGE_SECONDS = 7 * 24 * 3600
+MAX_BYTES = 512 * 1024 * 1024
+# a session touched this recently may belong to another running Blender, never evicted for size
+ACTIVE_SECONDS = 3600
+
+def file_stem(name: str) -> str:
+    """File-safe stem of a bake name; the short hash keeps names that clean the same (Rock.01, Rock_01) apart."""
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=4).hexdigest()
+    return f"{bpy.path.clean_name(name)}_{digest}"
+
+def scripts_dir() -> str:
+    return os.path.join(ROOT, "scripts")
+
+def session_dir(*parts: str) -> str:
+    """Folder of the current Blender session, created on demand."""
+    path = os.path.join(SESSIONS, SESSION_ID, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def new_job_dir(prefix: str) -> str:
+    return tempfile.mkdtemp(prefix=prefix, dir=session_dir())
+
+def remove(path: str):
+    shutil.rmtree(path, ignore_errors=True)
+
+def _usage(path: str):
+    """Total size and newest mtime of a folder tree."""
+    total, newest = 0, os.path.getmtime(path)
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            total += st.st_size
+            newest = max(newest, st.st_mtime)
+    return total, newest
+
+def sweep(max_age: float = MAX_AGE_SECONDS, max_bytes: int = MAX_BYTES) -> int:
+    """Remove stale session folders, return how many were removed."""
+    if not os.path.isdir(SESSIONS):
+        return 0
+    now = time.time()
+    sessions = []
+    for entry in os.scandir(SESSIONS):
+        if not entry.is_dir() or entry.name == SESSION_ID:
+            continue
+        size, newest = _usage(entry.path)
+        sessions.append((newest, size, entry.path))
+    sessions.sort()
+
+    removed = 0
+    total = sum(size for _, size, _ in sessions)
+    for newest, size, path in sessions:
+        age = now - newest
+        if age > max_age or (total > max_bytes and age > ACTIVE_SECONDS):
+            remove(path)
+            total -= size
+            removed += 1
+    return removed
+
+def _sweep_timer():
+    sweep()
+    return None
+
+def register():
+    # off the registration path: Blender start-up does not wait on the disk walk
+    bpy.app.timers.register(_sweep_timer, first_interval=5.0)
+
+def unregister():
+    if bpy.app.timers.is_registered(_sweep_timer):
+        bpy.app.timers.unregister(_sweep_timer)
+    remove(os.path.join(SESSIONS, SESSION_ID))
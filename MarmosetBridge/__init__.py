@@ -1 +1 @@
-﻿__all__ = ["Functions", "Operators","MapProperties", "Properties", "Panels"]
\ No newline at end of file
+﻿__all__ = ["Functions", "Operators","MapProperties", "Properties", "Session", "Queue", "Results", "Script", "Cache", "WorkDir", "Process", "Panels"]
\ No newline at end of file
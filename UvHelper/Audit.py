@@ -0,0 +1,67 @@
+﻿import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Topology checks on the mesh arrays, run on worker threads.
+
+# faces below this area are reported as degenerate
+ZERO_AREA_EPSILON = 1e-10
+
+@dataclass
+class MeshArrays:
+    name: str
+    vert_count: int
+    face_sizes: np.ndarray      # corners per face (polygons.loop_total)
+    face_areas: np.ndarray      # polygons.area
+    loop_edges: np.ndarray      # edge used by each face corner (loops.edge_index)
+    edge_verts: np.ndarray      # (n, 2) vertex pair of each edge
+
+@dataclass
+class AuditReport:
+    name: str
+    faces: int = 0
+    ngons: int = 0
+    non_manifold_edges: int = 0
+    boundary_edges: int = 0
+    zero_area_faces: int = 0
+    loose_verts: int = 0
+
+    @property
+    def has_issues(self) -> bool:
+        # open borders are normal on a low poly, they are reported but not flagged
+        return bool(self.ngons or self.non_manifold_edges or self.zero_area_faces or self.loose_verts)
+
+    def summary(self) -> str:
+        return (f"{self.name}: {self.ngons} ngons, {self.non_manifold_edges} non-manifold edges, "
+                f"{self.boundary_edges} boundary edges, {self.zero_area_faces} zero-area faces, {self.loose_verts} loose verts")
+
+def analyse_mesh_arrays(arrays: MeshArrays, area_epsilon: float = ZERO_AREA_EPSILON) -> AuditReport:
+    edge_count = len(arrays.edge_verts)
+    # a manifold edge is shared by exactly two faces, a boundary edge by one; wire edges (no face)
+    # and edges shared by more than two faces are non-manifold, as in Select Non Manifold
+    edge_face_counts = np.bincount(arrays.loop_edges, minlength=edge_count)
+    # a loose vert is not used by any edge
+    vert_edge_counts = np.bincount(arrays.edge_verts.ravel(), minlength=arrays.vert_count)
+
+    return AuditReport(
+        name=arrays.name,
+        faces=len(arrays.face_sizes),
+        ngons=int(np.count_nonzero(arrays.face_sizes > 4)),
+        non_manifold_edges=int(np.count_nonzero((edge_face_counts == 0) | (edge_face_counts > 2))),
+        boundary_edges=int(np.count_nonzero(edge_face_counts == 1)),
+        zero_area_faces=int(np.count_nonzero(arrays.face_areas <= area_epsilon)),
+        loose_verts=int(np.count_nonzero(vert_edge_counts == 0)),
+    )
+
+def run_audit(arrays_list: List[MeshArrays], max_workers: Optional[int] = None) -> List[AuditReport]:
+    """Analyse every mesh on a thread pool and return the reports in input order."""
+    if not arrays_list:
+        return []
+    # NumPy releases the GIL in its heavy loops, so threads scale without spawning new Blender processes
+    workers = max_workers or min(len(arrays_list), os.cpu_count() or 1)
+    if workers <= 1:
+        return [analyse_mesh_arrays(arrays) for arrays in arrays_list]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(analyse_mesh_arrays, arrays_list))
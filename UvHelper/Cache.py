@@ -0,0 +1,48 @@
+﻿from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+import numpy as np
+
+# default memory cap of the shared analysis cache
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+@dataclass
+class MeshAnalysis:
+    edges: np.ndarray       # manifold edges (shared by exactly two faces)
+    edge_cos: np.ndarray    # cosine of the angle between the two face normals of each of those edges
+
+    @property
+    def nbytes(self) -> int:
+        return self.edges.nbytes + self.edge_cos.nbytes
+
+class AnalysisCache:
+    """LRU cache of MeshAnalysis results, bounded by the total size of their arrays."""
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: "OrderedDict[Hashable, MeshAnalysis]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[MeshAnalysis]:
+        analysis = self._entries.get(key)
+        if analysis is not None:
+            self._entries.move_to_end(key)
+        return analysis
+
+    def put(self, key: Hashable, analysis: MeshAnalysis):
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key).nbytes
+        # an entry bigger than the whole cap is simply not kept
+        if analysis.nbytes > self.max_bytes:
+            return
+        self._entries[key] = analysis
+        self.nbytes += analysis.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
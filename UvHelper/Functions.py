@@ -1,4 +1,13 @@
-﻿import bpy, bmesh, math
+﻿import bpy, bmesh, math, time, hashlib
+import numpy as np
+from typing import Optional
+from .Audit import MeshArrays, run_audit
+from .Cache import AnalysisCache, MeshAnalysis
+
+AUDIT_TEXT_NAME = "BakeFlow Topology Audit"
+
+# per-mesh analysis shared by the UvHelper operators, keyed by mesh_fingerprint
+ANALYSIS_CACHE = AnalysisCache()
 
 def GoToLine(layout, *, scale_y=1.2, align=True):
     row = layout.row(align=align)
@@ -12,37 +21,253 @@ def popup_message(context, message):
         self.layout.label(text=message)
     context.window_manager.popup_menu(draw, title="Info", icon='INFO')
 
+# ===================== Bulk Mesh Access =====================
+
+# read a whole per-element attribute in one foreach_get call
+def _read_array(collection, attr: str, dtype, width: int = 1):
+    arr = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attr, arr)
+    return arr if width == 1 else arr.reshape(-1, width)
+
+def loop_faces(me):
+    """Face index of every loop, whatever order the faces store their loops in."""
+    loop_start = _read_array(me.polygons, "loop_start", np.int32)
+    loop_total = _read_array(me.polygons, "loop_total", np.int32)
+    face_order = np.argsort(loop_start, kind='stable')
+    return np.repeat(face_order.astype(np.int32), loop_total[face_order])
+
+def edge_face_pairs(me):
+    """Return (edges, face_a, face_b) for every edge shared by exactly two faces."""
+    loop_edges = _read_array(me.loops, "edge_index", np.int32)
+    loop_face = loop_faces(me)
+
+    # group the loops by edge: each edge gets a contiguous run of its faces
+    counts = np.bincount(loop_edges, minlength=len(me.edges))
+    by_edge = np.argsort(loop_edges, kind='stable')
+    edge_faces = loop_face[by_edge]
+    run_start = np.cumsum(counts) - counts
+
+    edges = np.flatnonzero(counts == 2)
+    first = run_start[edges]
+    return edges, edge_faces[first], edge_faces[first + 1]
+
+def edge_normal_cosines(me):
+    """Return (edges, cos) with the cosine between the two face normals of each manifold edge."""
+    edges, face_a, face_b = edge_face_pairs(me)
+    normals = _read_array(me.polygons, "normal", np.float32, 3)
+    cos = np.einsum("ij,ij->i", normals[face_a], normals[face_b])
+    return edges, np.clip(cos, -1.0, 1.0)
+
+# ===================== Analysis Cache =====================
+
+def mesh_fingerprint(me) -> tuple:
+    """Cheap key of the mesh geometry: element counts plus a hash of the coordinate and corner buffers."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_read_array(me.vertices, "co", np.float32, 3).tobytes())
+    digest.update(_read_array(me.loops, "vertex_index", np.int32).tobytes())
+    digest.update(_read_array(me.loops, "edge_index", np.int32).tobytes())
+    return (len(me.vertices), len(me.edges), len(me.loops), len(me.polygons), digest.hexdigest())
+
+def mesh_analysis(me, cache: Optional[AnalysisCache] = ANALYSIS_CACHE) -> MeshAnalysis:
+    """Edge-angle analysis of the mesh, reused from the cache as long as its geometry did not change."""
+    key = mesh_fingerprint(me) if cache is not None else None
+    analysis = cache.get(key) if cache is not None else None
+    if analysis is None:
+        analysis = MeshAnalysis(*edge_normal_cosines(me))
+        if cache is not None:
+            cache.put(key, analysis)
+    return analysis
+
+def edges_over_angle(me, angle_threshold: float, cache: Optional[AnalysisCache] = ANALYSIS_CACHE):
+    """Boolean mask of the visible edges whose face normals differ by at least angle_threshold degrees."""
+    analysis = mesh_analysis(me, cache)
+    # angle >= threshold  <=>  cos(angle) <= cos(threshold), no per-edge acos needed
+    picked = analysis.edges[analysis.edge_cos <= math.cos(math.radians(angle_threshold))]
+    hidden = _read_array(me.edges, "hide", bool)
+    mask = np.zeros(len(me.edges), dtype=bool)
+    mask[picked[~hidden[picked]]] = True
+    return mask
+
+def write_edge_selection(me, edge_mask):
+    """Replace the mesh selection by edge_mask (and the verts of those edges) in one pass."""
+    edge_verts = _read_array(me.edges, "vertices", np.int32, 2)
+    vert_mask = np.zeros(len(me.vertices), dtype=bool)
+    vert_mask[edge_verts[edge_mask].ravel()] = True
+    me.vertices.foreach_set("select", vert_mask)
+    me.edges.foreach_set("select", edge_mask)
+    me.polygons.foreach_set("select", np.zeros(len(me.polygons), dtype=bool))
+
+def write_face_selection(me, face_mask):
+    """Replace the mesh selection by face_mask (and the verts/edges of those faces) in one pass."""
+    loop_mask = face_mask[loop_faces(me)]
+    loop_verts = _read_array(me.loops, "vertex_index", np.int32)
+    loop_edges = _read_array(me.loops, "edge_index", np.int32)
+    vert_mask = np.zeros(len(me.vertices), dtype=bool)
+    vert_mask[loop_verts[loop_mask]] = True
+    edge_mask = np.zeros(len(me.edges), dtype=bool)
+    edge_mask[loop_edges[loop_mask]] = True
+    me.vertices.foreach_set("select", vert_mask)
+    me.edges.foreach_set("select", edge_mask)
+    me.polygons.foreach_set("select", face_mask)
+
+def ngon_face_mask(me):
+    """Boolean mask of the visible faces with more than four corners."""
+    # one loop_total read is cheaper than the cache fingerprint, which hashes the vertex and loop buffers
+    face_sizes = _read_array(me.polygons, "loop_total", np.int32)
+    return (face_sizes > 4) & ~_read_array(me.polygons, "hide", bool)
+
 def select_edges_by_normal_difference(self, context):
     properties = context.scene.BF_UH_Properties
-    bpy.ops.mesh.select_all(action='DESELECT')
+    edit_objects = [obj for obj in context.objects_in_mode if obj.type == 'MESH']
+
+    # leaving edit mode flushes the edit meshes, so everything can be read and written in bulk
+    bpy.ops.object.mode_set(mode='OBJECT')
 
     total_selected_edges = 0
+    for obj in edit_objects:
+        me = obj.data
+        edge_mask = edges_over_angle(me, properties.angle_threshold)
+        write_edge_selection(me, edge_mask)
+        total_selected_edges += int(np.count_nonzero(edge_mask))
 
+    bpy.ops.object.mode_set(mode='EDIT')
 
-    for obj in context.objects_in_mode:
-        me = obj.data
-        bm = bmesh.from_edit_mesh(me)
-
-        angle_threshold = properties.angle_threshold
-
-        selected_edges = 0
-        for edge in bm.edges:
-            if len(edge.link_faces) == 2:
-                dot_product = edge.link_faces[0].normal.dot(edge.link_faces[1].normal)
-                if -1.0 <= dot_product <= 1.0:
-                    angle = math.degrees(math.acos(dot_product))
-                    if angle >= angle_threshold:
-                        edge.select_set(True)
-                        selected_edges += 1
-
-        bmesh.update_edit_mesh(me)
-        total_selected_edges += selected_edges
-    
     if total_selected_edges == 0:
         info = "No edges found with the specified angle threshold"
         popup_message(context, info)
     bpy.ops.ed.undo_push(message="Select Edges by Normal")
 
+# ===================== Live Angle Preview =====================
+
+class EdgeAnglePreview:
+    """Per-object state of the live threshold preview.
+
+    The visible manifold edges are sorted once by the cosine of their normal angle, so the edges over any
+    threshold are a prefix of that order: a threshold change only touches the edges between the old and the new cut.
+    """
+    def __init__(self, obj, cache: Optional[AnalysisCache] = ANALYSIS_CACHE):
+        self.obj = obj
+        analysis = mesh_analysis(obj.data, cache)
+        visible = ~_read_array(obj.data.edges, "hide", bool)[analysis.edges]
+        edges, edge_cos = analysis.edges[visible], analysis.edge_cos[visible]
+        order = np.argsort(edge_cos, kind='stable')
+        self.sorted_edges = edges[order]
+        self.sorted_cos = edge_cos[order]
+        # position of each edge in the sorted order, past the end for edges never selected
+        self.rank = np.full(len(obj.data.edges), len(edges), dtype=np.int64)
+        self.rank[self.sorted_edges] = np.arange(len(edges))
+        self.cut = 0
+        self.bm = None
+        # selection from before the preview, written back on cancel
+        me = obj.data
+        self.start_selection = tuple(_read_array(elements, "select", bool)
+                                     for elements in (me.vertices, me.edges, me.polygons))
+
+    def cut_for(self, angle_threshold: float) -> int:
+        return int(np.searchsorted(self.sorted_cos, math.cos(math.radians(angle_threshold)), side='right'))
+
+    def write_initial(self, angle_threshold: float):
+        """Bulk selection write, to call in Object Mode before entering the preview."""
+        self.cut = self.cut_for(angle_threshold)
+        edge_mask = np.zeros(len(self.obj.data.edges), dtype=bool)
+        edge_mask[self.sorted_edges[:self.cut]] = True
+        write_edge_selection(self.obj.data, edge_mask)
+
+    def restore_selection(self):
+        """Write back the selection from before the preview, to call in Object Mode."""
+        self.bm = None
+        me = self.obj.data
+        for elements, mask in zip((me.vertices, me.edges, me.polygons), self.start_selection):
+            elements.foreach_set("select", mask)
+
+    def attach(self):
+        """Bind to the edit mesh, to call once the object is in Edit Mode."""
+        self.bm = bmesh.from_edit_mesh(self.obj.data)
+        self.bm.edges.ensure_lookup_table()
+        self.bm.edges.index_update()
+
+    def set_threshold(self, angle_threshold: float):
+        cut = self.cut_for(angle_threshold)
+        if cut == self.cut:
+            return
+        select = cut > self.cut
+        bm_edges = self.bm.edges
+        changed = self.sorted_edges[min(cut, self.cut):max(cut, self.cut)]
+        for index in changed:
+            bm_edges[index].select_set(select)
+        if not select:
+            # deselecting an edge deselects its verts, reselect the kept edges sharing them or the flush drops them
+            rank = self.rank
+            for index in changed:
+                for vert in bm_edges[index].verts:
+                    for edge in vert.link_edges:
+                        if rank[edge.index] < cut:
+                            edge.select_set(True)
+        self.cut = cut
+        self.bm.select_flush_mode()
+        bmesh.update_edit_mesh(self.obj.data, loop_triangles=False, destructive=False)
+
+# ===================== Benchmark =====================
+
+# the original per-edge bmesh loop, kept as the reference for the benchmark
+def _count_edges_by_normal_bmesh(bm, angle_threshold: float) -> int:
+    selected_edges = 0
+    for edge in bm.edges:
+        if len(edge.link_faces) == 2:
+            dot_product = edge.link_faces[0].normal.dot(edge.link_faces[1].normal)
+            if -1.0 <= dot_product <= 1.0:
+                angle = math.degrees(math.acos(dot_product))
+                if angle >= angle_threshold:
+                    selected_edges += 1
+    return selected_edges
+
+def benchmark_edges_by_normal(segments=(64, 256, 1024), angle_threshold: float = 30.0):
+    """Time the bmesh loop against the NumPy engine on noisy grids of increasing size.
+
+    Run it from Blender's Python console:
+        from BakeFlow.UvHelper.Functions import benchmark_edges_by_normal
+        benchmark_edges_by_normal()
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    for count in segments:
+        me = bpy.data.meshes.new("BF_UH_Benchmark")
+        bm = bmesh.new()
+        try:
+            bmesh.ops.create_grid(bm, x_segments=count, y_segments=count, size=1.0)
+            bm.to_mesh(me)
+            # bump the grid so the face normals actually differ
+            co = _read_array(me.vertices, "co", np.float32, 3)
+            co[:, 2] = rng.random(len(co), dtype=np.float32) * (2.0 / count)
+            me.vertices.foreach_set("co", co.ravel())
+            me.update()
+            bm.clear()
+            bm.from_mesh(me)
+            bm.normal_update()
+
+            start = time.perf_counter()
+            bmesh_count = _count_edges_by_normal_bmesh(bm, angle_threshold)
+            bmesh_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            numpy_count = int(np.count_nonzero(edges_over_angle(me, angle_threshold, cache=None)))
+            numpy_time = time.perf_counter() - start
+        finally:
+            bm.free()
+            bpy.data.meshes.remove(me)
+
+        results.append({
+            "faces": count * count,
+            "bmesh_seconds": bmesh_time,
+            "numpy_seconds": numpy_time,
+            "speedup": bmesh_time / max(numpy_time, 1e-9),
+            "bmesh_edges": bmesh_count,
+            "numpy_edges": numpy_count,
+        })
+        print(f"{count * count:>9} faces | bmesh {bmesh_time:8.3f}s | numpy {numpy_time:8.3f}s "
+              f"| x{results[-1]['speedup']:.1f} | edges {bmesh_count}/{numpy_count}")
+    return results
+
 def tag_seam_sharp_edges():
     bpy.ops.mesh.select_mode(type="EDGE")
     bpy.ops.mesh.mark_seam(clear=False)
@@ -81,118 +306,120 @@ def add_modifier(context):
 
     popup_message(context, f"Added Triangulate, Weighted Normal, and enabled smooth shading for {len(selected_objects)} objects.")
 
+def objects_in_range(context, range_option: str):
+    """Mesh objects covered by a SELECTED / VISIBLE / ALL range option."""
+    match range_option:
+        case 'SELECTED':
+            return [obj for obj in context.selected_objects if obj.type == 'MESH']
+        case 'VISIBLE':
+            return [obj for obj in context.visible_objects if obj.type == 'MESH']
+        case 'ALL':
+            return [obj for obj in bpy.data.objects if obj.type == 'MESH']
+    return []
+
 def ngon_detector(self, context):
     properties = context.scene.BF_UH_Properties
-    meshes_to_switch_to_edit = []  # will hold meshes with ngons
-    ngon_count = 0
     range_option = properties.ngon_detect_range
-    object_to_scan = []
 
     if context.mode == 'EDIT_MESH':
-        bpy.ops.mesh.select_all(action='DESELECT')
-    
-        for obj in bpy.context.objects_in_mode:  # loop, not assign
-            bm = bmesh.from_edit_mesh(obj.data)
-            for face in bm.faces:
-                if len(face.verts) > 4:
-                    face.select_set(True)
-                    meshes_to_switch_to_edit.append(obj)
-                    ngon_count += 1
-            bmesh.update_edit_mesh(obj.data)
-    
+        edit_objects = [obj for obj in context.objects_in_mode if obj.type == 'MESH']
+        # leaving edit mode flushes the edit meshes, so the face sizes can be read in bulk
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        ngon_count = 0
+        for obj in edit_objects:
+            face_mask = ngon_face_mask(obj.data)
+            write_face_selection(obj.data, face_mask)
+            ngon_count += int(np.count_nonzero(face_mask))
+
+        bpy.ops.object.mode_set(mode='EDIT')
         self.report({'INFO'}, f"Detected {ngon_count} N-Gons on current edit meshes")
         return {'FINISHED'}
 
-    match range_option:
-        case 'SELECTED':
-            object_to_scan = [obj for obj in context.selected_objects if obj.type == 'MESH']
-        case 'VISIBLE':
-            object_to_scan = [obj for obj in context.visible_objects if obj.type == 'MESH']
-        case 'ALL':
-            object_to_scan = [obj for obj in bpy.data.objects if obj.type == 'MESH']
+    object_to_scan = objects_in_range(context, range_option)
 
     if not object_to_scan:
         self.report({'INFO'}, "No mesh objects to scan")
         return {'CANCELLED'}
 
-    # --- NEW: remember original visibility if scanning ALL
-    original_hidden = {}
-    if range_option == 'ALL':
-        for o in object_to_scan:
-            # record whether the object itself was hidden (object-level)
-            # hide_get() includes collection visibility; we use both so we can re-hide object-level cases
-            original_hidden[o.name] = (o.hide_viewport or o.hide_get())
-            # unhide object-level so we can enter edit mode and scan
-            o.hide_viewport = False
-            o.hide_set(False)
-
-    # Ensure Object Mode before switching objects
+    # Ensure Object Mode so the mesh data is up to date
     if context.mode != 'OBJECT':
         bpy.ops.object.mode_set(mode='OBJECT')
 
-    # Deselect all OBJECTS safely in Object Mode
-    bpy.ops.object.select_all(action='DESELECT')
-
+    # Scan every mesh straight from its data, no edit mode needed; shared meshes are scanned once
+    ngons_per_mesh = {}
     for obj in object_to_scan:
-        if obj.type != 'MESH':
-            continue
+        key = obj.data.as_pointer()
+        if key not in ngons_per_mesh:
+            face_mask = ngon_face_mask(obj.data)
+            write_face_selection(obj.data, face_mask)
+            ngons_per_mesh[key] = int(np.count_nonzero(face_mask))
 
-        # If still not visible (e.g., hidden by a hidden collection), skip it safely
-        if not obj.visible_get():
-            continue
+    meshes_to_switch_to_edit = [obj for obj in object_to_scan if ngons_per_mesh[obj.data.as_pointer()]]
+    ngon_count = sum(ngons_per_mesh[obj.data.as_pointer()] for obj in meshes_to_switch_to_edit)
 
-        # Make it active (and selected helps in some edge cases)
-        obj.select_set(True)
-        context.view_layer.objects.active = obj
+    # if ALL, unhide only the objects that have ngons so they can be edited
+    if range_option == 'ALL':
+        for o in meshes_to_switch_to_edit:
+            if o.hide_viewport or o.hide_get():
+                o.hide_viewport = False
+                o.hide_set(False)
 
+    # Put all meshes with ngons into multi-object Edit Mode, once
+    bpy.ops.object.select_all(action='DESELECT')
+    editable = [o for o in meshes_to_switch_to_edit if o.visible_get()]
+    if editable:
+        for o in editable:
+            o.select_set(True)
+        context.view_layer.objects.active = editable[0]
+        # enter multi-object edit mode (their face selections will show)
         bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='DESELECT')
 
-        bm = bmesh.from_edit_mesh(obj.data)
+    self.report({'INFO'}, f"Detected {ngon_count} N-Gons on {len(meshes_to_switch_to_edit)} objects and switched to Edit Mode for relevant meshes")
+    return {'FINISHED'}
 
-        found_on_this = 0
-        for face in bm.faces:
-            if len(face.verts) > 4:
-                face.select_set(True)
-                found_on_this += 1
 
-        if found_on_this > 0:
-            meshes_to_switch_to_edit.append(obj)
-            ngon_count += found_on_this
+# ===================== Topology Audit =====================
 
-        bmesh.update_edit_mesh(obj.data)
+def extract_mesh_arrays(obj) -> MeshArrays:
+    me = obj.data
+    return MeshArrays(
+        name=obj.name,
+        vert_count=len(me.vertices),
+        face_sizes=_read_array(me.polygons, "loop_total", np.int32),
+        face_areas=_read_array(me.polygons, "area", np.float32),
+        loop_edges=_read_array(me.loops, "edge_index", np.int32),
+        edge_verts=_read_array(me.edges, "vertices", np.int32, 2),
+    )
 
-        bpy.ops.object.mode_set(mode='OBJECT')
-        obj.select_set(False)
-
-    # --- NEW: if ALL, re-hide only those that were hidden and have NO ngons
-    if range_option == 'ALL' and original_hidden:
-        ngons_set = {o.name for o in meshes_to_switch_to_edit}
-        for o in object_to_scan:
-            if original_hidden.get(o.name, False) and o.name not in ngons_set:
-                # re-hide at object level
-                o.hide_set(True)
-                o.hide_viewport = True
-
-    # Put all meshes with ngons into multi-object Edit Mode
-    if meshes_to_switch_to_edit:
-        # go to Object mode, select all targets, set one active, then enter Edit once
-        if context.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-
-        bpy.ops.object.select_all(action='DESELECT')
-        for o in meshes_to_switch_to_edit:
-            if o.visible_get():
-                o.select_set(True)
-        # set active to the first visible one
-        for o in meshes_to_switch_to_edit:
-            if o.visible_get():
-                context.view_layer.objects.active = o
-                break
+def topology_audit(self, context):
+    properties = context.scene.BF_UH_Properties
+    object_to_scan = objects_in_range(context, properties.ngon_detect_range)
 
-        # enter multi-object edit mode (their face selections will show)
-        if context.view_layer.objects.active:
-            bpy.ops.object.mode_set(mode='EDIT')
+    if not object_to_scan:
+        self.report({'INFO'}, "No mesh objects to scan")
+        return {'CANCELLED'}
+
+    # Ensure Object Mode so the mesh data is up to date, then go back to the mode the user was in
+    start_mode = context.object.mode if context.object else 'OBJECT'
+    if context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
 
-    self.report({'INFO'}, f"Detected {ngon_count} N-Gons and switched to Edit Mode for relevant meshes")
-    return {'FINISHED'}
\ No newline at end of file
+    # Extract on the main thread (bpy is not thread safe), analyse on the pool
+    arrays = [extract_mesh_arrays(obj) for obj in object_to_scan]
+    if start_mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode=start_mode)
+    reports = run_audit(arrays)
+    flagged = [report for report in reports if report.has_issues]
+
+    text = bpy.data.texts.get(AUDIT_TEXT_NAME) or bpy.data.texts.new(AUDIT_TEXT_NAME)
+    text.clear()
+    text.write(f"Topology audit: {len(flagged)} of {len(reports)} objects with issues\n\n")
+    for report in flagged:
+        text.write(report.summary() + "\n")
+
+    if flagged:
+        self.report({'WARNING'}, f"Topology issues on {len(flagged)} of {len(reports)} objects, see the '{AUDIT_TEXT_NAME}' text")
+    else:
+        self.report({'INFO'}, f"No topology issues found on {len(reports)} objects")
+    return {'FINISHED'}
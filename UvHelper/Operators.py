@@ -13,6 +13,81 @@ class BF_UH_EdgesByNormal(bpy.types.Operator):
     def execute(self, context):
         select_edges_by_normal_difference(self, context)
         return {'FINISHED'}
+
+class BF_UH_EdgesByNormalPreview(bpy.types.Operator):
+    bl_idname = "object.bf_uh_edges_by_normal_preview"
+    bl_label = "Live Select Edges by Normal Difference"
+    bl_description = "Drag the mouse to scrub the angle threshold and see the edge selection update live"
+
+    # degrees per pixel of horizontal mouse movement
+    sensitivity = 0.2
+
+    @classmethod
+    def poll(cls, context):
+        # Prevent running outside edit mode entirely
+        return context.mode == 'EDIT_MESH'
+
+    def invoke(self, context, event):
+        properties = context.scene.BF_UH_Properties
+        edit_objects = [obj for obj in context.objects_in_mode if obj.type == 'MESH']
+
+        # sort the angles and write the starting selection in bulk, then come back to edit mode once
+        bpy.ops.object.mode_set(mode='OBJECT')
+        self._previews = [EdgeAnglePreview(obj) for obj in edit_objects]
+        for preview in self._previews:
+            preview.write_initial(properties.angle_threshold)
+        bpy.ops.object.mode_set(mode='EDIT')
+        for preview in self._previews:
+            preview.attach()
+
+        self._start_threshold = properties.angle_threshold
+        self._threshold = properties.angle_threshold
+        self._start_x = event.mouse_x
+        self._update_header(context)
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def _set_threshold(self, context, angle_threshold):
+        self._threshold = min(max(angle_threshold, 0.0), 180.0)
+        for preview in self._previews:
+            preview.set_threshold(self._threshold)
+        self._update_header(context)
+
+    def _update_header(self, context):
+        count = sum(preview.cut for preview in self._previews)
+        context.area.header_text_set(
+            f"Angle: {self._threshold:.1f}°  |  {count} edges  |  LMB/Enter: confirm, RMB/Esc: cancel, Ctrl: snap, Ctrl+Wheel: nudge"
+        )
+
+    def modal(self, context, event):
+        # let the viewport navigation through, Ctrl+Wheel nudges the threshold
+        if event.type == 'MIDDLEMOUSE' or event.type.startswith('NDOF') \
+                or (event.type in {'WHEELUPMOUSE', 'WHEELDOWNMOUSE'} and not event.ctrl):
+            return {'PASS_THROUGH'}
+
+        match event.type:
+            case 'MOUSEMOVE':
+                angle = self._start_threshold + (event.mouse_x - self._start_x) * self.sensitivity
+                self._set_threshold(context, round(angle) if event.ctrl else angle)
+            case 'WHEELUPMOUSE':
+                self._start_threshold += 1.0
+                self._set_threshold(context, self._threshold + 1.0)
+            case 'WHEELDOWNMOUSE':
+                self._start_threshold -= 1.0
+                self._set_threshold(context, self._threshold - 1.0)
+            case 'LEFTMOUSE' | 'RET' | 'NUMPAD_ENTER' if event.value == 'PRESS':
+                context.scene.BF_UH_Properties.angle_threshold = self._threshold
+                context.area.header_text_set(None)
+                bpy.ops.ed.undo_push(message="Select Edges by Normal")
+                return {'FINISHED'}
+            case 'RIGHTMOUSE' | 'ESC' if event.value == 'PRESS':
+                bpy.ops.object.mode_set(mode='OBJECT')
+                for preview in self._previews:
+                    preview.restore_selection()
+                bpy.ops.object.mode_set(mode='EDIT')
+                context.area.header_text_set(None)
+                return {'CANCELLED'}
+        return {'RUNNING_MODAL'}
     
 class BF_UH_ContourSelect(bpy.types.Operator):
     bl_idname = "object.bf_uh_contour_select"
@@ -87,14 +162,24 @@ class BF_UH_Ngon(bpy.types.Operator):
         ngon_detector(self, context)
         return {'FINISHED'}
 
+class BF_UH_TopologyAudit(bpy.types.Operator):
+    bl_idname = "object.bf_uh_topology_audit"
+    bl_label = "Audit Topology"
+    bl_description = "Report ngons, non-manifold edges, zero-area faces and loose verts in the mesh range"
+
+    def execute(self, context):
+        return topology_audit(self, context)
+
       
 _classes = (
     BF_UH_EdgesByNormal,
+    BF_UH_EdgesByNormalPreview,
     BF_UH_ContourSelect,
     BF_UH_SeamSharpEdges,
     BF_UH_ClearSplitNormals,
     BF_UH_AddModifier,
     BF_UH_Ngon,
+    BF_UH_TopologyAudit,
 )
 def register():
     for cls in _classes:
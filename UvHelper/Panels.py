@@ -18,6 +18,7 @@ class BF_UH_Panel(bpy.types.Panel):
         row = GoToLine(layout, align=False)
         row.operator("object.bf_uh_edges_by_normal", text="Select Edges by Angle")
         row.prop(properities, "angle_threshold", text="Angle")
+        row.operator("object.bf_uh_edges_by_normal_preview", text="", icon='ARROW_LEFTRIGHT')
         row = GoToLine(layout, align=False)
         row.operator("object.bf_uh_contour_select", text="Select Contour Edges")
         row = GoToLine(layout)
@@ -28,6 +29,7 @@ class BF_UH_Panel(bpy.types.Panel):
         row.operator("object.bf_uh_add_modifier", text="Add Modifiers")
         row = GoToLine(layout, align=False)
         row.operator("object.bf_uh_ngon", text="Detect Ngons")
+        row.operator("object.bf_uh_topology_audit", text="Audit Topology")
         row = GoToLine(layout)
         row.enabled = (context.mode == 'OBJECT')
         row.label(text="Range:")
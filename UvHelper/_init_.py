@@ -1 +1 @@
-﻿__all__ = ["Functions", "Operators", "Panels", "Properties"]
\ No newline at end of file
+﻿__all__ = ["Audit", "Cache", "Functions", "Operators", "Panels", "Properties"]
\ No newline at end of file
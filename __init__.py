@@ -14,17 +14,32 @@ bl_info = {
 }
   
 _SUBMODULES = (
+    "UvHelper.Audit",
+    "UvHelper.Cache",
     "UvHelper.Functions",
     "UvHelper.Properties",
     "UvHelper.Operators",
     "UvHelper.Panels",
     "BakingSupply.Functions",
+    "BakingSupply.Background",
+    "BakingSupply.MeshWriter",
+    "BakingSupply.NameIndex",
+    "BakingSupply.Pairing",
+    "BakingSupply.Rename",
+    "BakingSupply.Proxy",
     "BakingSupply.Properties",
     "BakingSupply.Operators",
     "BakingSupply.Panels",
+    "MarmosetBridge.Script",
+    "MarmosetBridge.WorkDir",
+    "MarmosetBridge.Process",
     "MarmosetBridge.Functions",
     "MarmosetBridge.MapProperties",
     "MarmosetBridge.Properties",
+    "MarmosetBridge.Session",
+    "MarmosetBridge.Queue",
+    "MarmosetBridge.Results",
+    "MarmosetBridge.Cache",
     "MarmosetBridge.Operators",
     "MarmosetBridge.Panels",
     
@@ -0,0 +1,34 @@
+﻿import sys, time, types
+
+# Stand-in for the Toolbag executable: `fake_toolbag.py -py <script>` runs the startup script with a
+# minimal `mset` module, then drives mset.callbacks.onPeriodicUpdate until the script calls mset.quit().
+
+UPDATE_SECONDS = 0.02
+
+class _Callbacks:
+    onPeriodicUpdate = None
+
+def _make_mset():
+    mset = types.ModuleType("mset")
+    mset.callbacks = _Callbacks()
+    mset.running = True
+    def quit():
+        mset.running = False
+    mset.quit = quit
+    return mset
+
+def main(argv):
+    if len(argv) != 2 or argv[0] != "-py":
+        print("usage: fake_toolbag.py -py <script>", file=sys.stderr)
+        return 2
+    mset = _make_mset()
+    sys.modules["mset"] = mset
+    with open(argv[1], "r", encoding="utf-8") as f:
+        exec(compile(f.read(), argv[1], "exec"), {"__name__": "__main__"})
+    while mset.running and mset.callbacks.onPeriodicUpdate is not None:
+        mset.callbacks.onPeriodicUpdate()
+        time.sleep(UPDATE_SECONDS)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
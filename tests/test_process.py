@@ -0,0 +1,72 @@
+﻿import os, sys, tempfile, time, unittest
+
+# Run from the repository root with: python -m unittest discover -s tests -t tests
+# (pytest collects the add-on package itself, which only imports inside Blender.)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from MarmosetBridge.Process import LaunchOptions, cpu_slots, launch
+
+# dummy executable: one line on each stream, then stays alive long enough to be inspected
+CHILD = "import sys, time; print('to stdout', flush=True); print('to stderr', file=sys.stderr, flush=True); time.sleep(30)"
+
+def _read(path: str, timeout: float = 10.0) -> str:
+    deadline = time.monotonic() + timeout
+    while True:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        if text or time.monotonic() > deadline:
+            return text
+        time.sleep(0.05)
+
+class LaunchTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="bakeflow_process_")
+        self.process = None
+
+    def tearDown(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+        self._tmp.cleanup()
+
+    def _launch(self, **options):
+        self.process = launch([sys.executable, "-c", CHILD], "dummy", LaunchOptions(log_dir=self._tmp.name, **options))
+        return self.process
+
+    def test_streams_reach_the_log_files(self):
+        self._launch()
+        self.assertIn("to stdout", _read(os.path.join(self._tmp.name, "dummy.out.log")))
+        self.assertIn("to stderr", _read(os.path.join(self._tmp.name, "dummy.err.log")))
+
+    @unittest.skipUnless(hasattr(os, "getpriority"), "POSIX niceness only")
+    def test_priority_sets_the_niceness(self):
+        process = self._launch(priority="LOW")
+        base = os.getpriority(os.PRIO_PROCESS, 0)
+        # a process can raise, never lower, its niceness: the child starts from ours and gets at least +15
+        self.assertEqual(os.getpriority(os.PRIO_PROCESS, process.pid), min(19, max(base, 15)))
+
+    @unittest.skipUnless(hasattr(os, "sched_getaffinity"), "needs sched_getaffinity")
+    def test_affinity_pins_the_process(self):
+        slots = cpu_slots(2, len(os.sched_getaffinity(0)))
+        allowed = sorted(os.sched_getaffinity(0))
+        # cpu_slots counts from 0, map its indices onto the CPUs this test may use
+        wanted = tuple(allowed[i] for i in slots[-1])
+        process = self._launch(affinity=wanted)
+        self.assertEqual(os.sched_getaffinity(process.pid), set(wanted))
+
+class CpuSlotsTest(unittest.TestCase):
+    def test_slots_split_the_cpus_without_overlap(self):
+        slots = cpu_slots(3, 8)
+        self.assertEqual(slots, [(0, 1, 2), (3, 4, 5), (6, 7)])
+
+    def test_more_workers_than_cpus_share_round_robin(self):
+        slots = cpu_slots(5, 2)
+        self.assertEqual(slots, [(0,), (1,), (0,), (1,), (0,)])
+
+    def test_zero_workers_still_get_one_slot(self):
+        self.assertEqual(cpu_slots(0, 4), [(0, 1, 2, 3)])
+
+if __name__ == "__main__":
+    unittest.main()
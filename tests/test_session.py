@@ -0,0 +1,61 @@
+﻿import os, sys, tempfile, unittest
+
+# Run from the repository root with: python -m unittest discover -s tests -t tests
+# (pytest collects the add-on package itself, which only imports inside Blender.)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from MarmosetBridge.Session import ToolbagSession, DONE, FAILED, JOB_SUFFIX
+
+FAKE_TOOLBAG = os.path.join(ROOT, "tests", "fake_toolbag.py")
+
+class FakeToolbagSession(ToolbagSession):
+    """Runs fake_toolbag.py through the current interpreter, with Toolbag's `-py <script>` arguments."""
+    def command(self, script_path):
+        return [sys.executable, FAKE_TOOLBAG, self.script_flag, script_path]
+
+class ToolbagSessionTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="bakeflow_session_")
+        self.job_dir = os.path.join(self._tmp.name, "jobs")
+        self.session = FakeToolbagSession("fake_toolbag", self.job_dir, poll_seconds=0.05)
+        self.session.start()
+
+    def tearDown(self):
+        self.session.stop()
+        if self.session.is_alive():
+            self.session._process.kill()
+        self.session._process.wait()
+        self._tmp.cleanup()
+
+    def test_job_runs_and_is_marked_done(self):
+        output = os.path.join(self._tmp.name, "out.txt")
+        job_id = self.session.submit(f"open({output!r}, 'w').write('baked')\n")
+        self.assertEqual(self.session.wait(job_id, timeout=10), DONE)
+        with open(output) as f:
+            self.assertEqual(f.read(), "baked")
+        self.assertFalse(os.path.exists(os.path.join(self.job_dir, job_id + JOB_SUFFIX)))
+
+    def test_failing_job_keeps_its_traceback(self):
+        job_id = self.session.submit("raise ValueError('no baker')\n")
+        self.assertEqual(self.session.wait(job_id, timeout=10), FAILED)
+        self.assertIn("ValueError: no baker", self.session.error(job_id))
+
+    def test_jobs_run_in_order_in_one_process(self):
+        output = os.path.join(self._tmp.name, "order.txt")
+        pid = self.session._process.pid
+        job_ids = [self.session.submit(f"open({output!r}, 'a').write('{i}')\n") for i in range(3)]
+        for job_id in job_ids:
+            self.assertEqual(self.session.wait(job_id, timeout=10), DONE)
+        with open(output) as f:
+            self.assertEqual(f.read(), "012")
+        self.assertEqual(self.session._process.pid, pid)
+
+    def test_stop_ends_the_process(self):
+        self.session.stop(timeout=10)
+        self.assertFalse(self.session.is_alive())
+        self.assertEqual(self.session._process.returncode, 0)
+
+if __name__ == "__main__":
+    unittest.main()